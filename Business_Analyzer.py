@@ -3,14 +3,665 @@ import streamlit_extras
 from streamlit_extras.buy_me_a_coffee import button
 import requests
 import pandas as pd
+import numpy as np
+import os
+import sys
+import re
+import csv
+import json
+import gzip
+import zlib
 import time
+import hashlib
+import bisect
+import itertools
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 from math import radians, cos, sin, asin, sqrt
 from difflib import SequenceMatcher
 from textblob import TextBlob
 from datetime import datetime, timedelta
 
+# Where jobs, recordings and other local state are persisted between runs
+DATA_DIR = os.environ.get('BUSINESS_ANALYZER_DATA_DIR', '.business_analyzer')
+
+# Google Maps API host, overridable to point the app at a local stand-in (e.g. for load tests)
+GOOGLE_MAPS_API_BASE_URL = os.environ.get('GOOGLE_MAPS_API_BASE_URL', 'https://maps.googleapis.com')
+
+# HTTP Record and Replay
+
+# 'record' captures every API exchange to the archive, 'replay' serves them back without the network
+HTTP_MODE = os.environ.get('BUSINESS_ANALYZER_HTTP_MODE', '')
+HTTP_ARCHIVE_PATH = os.environ.get('BUSINESS_ANALYZER_HTTP_ARCHIVE', os.path.join(DATA_DIR, 'http_archive.jsonl.gz'))
+HTTP_REPLAY_LATENCY = os.environ.get('BUSINESS_ANALYZER_REPLAY_LATENCY', '') == '1'
+
+class ReplayedResponse:
+    """
+    Minimal stand-in for requests.Response built from a recorded exchange.
+    """
+
+    def __init__(self, url, status_code, text):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+class HttpArchive:
+    """
+    Record HTTP exchanges to, or replay them from, a gzip-compressed JSON-lines archive.
+
+    Exchanges are keyed by method, URL and query parameters (without the API key).
+    Repeated requests for the same key are replayed in the order they were recorded.
+    Each exchange is its own gzip member, so a run interrupted mid-write only loses the
+    exchange it was writing.
+    """
+
+    def __init__(self, path, mode, replay_latency=False):
+        self.path = path
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self._lock = threading.Lock()
+        self._recordings = {}  # key -> list of recorded exchanges
+        self._replay_positions = {}
+        if mode == 'replay':
+            self._load()
+        else:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            if os.path.exists(path):
+                # Drop a damaged last record before appending, so new records stay readable
+                _, valid_length = self._read_exchanges()
+                if valid_length < os.path.getsize(path):
+                    with open(path, 'r+b') as f:
+                        f.truncate(valid_length)
+
+    @staticmethod
+    def _key(method, url, params):
+        params = {k: v for k, v in (params or {}).items() if k != 'key'}
+        return f"{method} {url} {json.dumps(params, sort_keys=True, default=str)}"
+
+    def _read_exchanges(self):
+        """
+        Read the archived exchanges, stopping at the first damaged record.
+
+        Returns:
+            list: Exchanges in the order they were recorded.
+            int: Length in bytes of the undamaged part of the archive.
+        """
+        with open(self.path, 'rb') as f:
+            data = memoryview(f.read())
+        exchanges = []
+        offset = 0
+        try:
+            while offset < len(data):
+                # Decompress one gzip member, a chunk at a time so leftover input stays small
+                decompressor = zlib.decompressobj(wbits=31)
+                text = []
+                position = offset
+                while not decompressor.eof and position < len(data):
+                    chunk = data[position:position + 65536]
+                    text.append(decompressor.decompress(chunk))
+                    position += len(chunk)
+                if not decompressor.eof:
+                    break  # Cut short by an interrupted run
+                lines = b''.join(text).decode('utf-8').splitlines()
+                exchanges.extend([json.loads(line) for line in lines])
+                offset = position - len(decompressor.unused_data)
+        except (zlib.error, UnicodeDecodeError, json.JSONDecodeError):
+            pass  # Corrupt record; keep what came before it
+        return exchanges, offset
+
+    def _load(self):
+        exchanges, _ = self._read_exchanges()
+        for exchange in exchanges:
+            key = self._key(exchange['method'], exchange['url'], exchange['params'])
+            self._recordings.setdefault(key, []).append(exchange)
+
+    def request(self, method, url, params=None, **kwargs):
+        """
+        Perform (and record) or replay an HTTP request.
+
+        Parameters:
+            method (str): 'GET' or 'HEAD'.
+            url (str): Request URL.
+            params (dict): Query parameters.
+            **kwargs: Extra arguments passed through to requests.
+
+        Returns:
+            requests.Response or ReplayedResponse: The response.
+        """
+        if self.mode == 'replay':
+            return self._replay(method, url, params)
+        
+        start = time.perf_counter()
+        response = requests.request(method, url, params=params, **kwargs)
+        elapsed = time.perf_counter() - start
+        exchange = {
+            'method': method,
+            'url': url,
+            'params': {k: v for k, v in (params or {}).items() if k != 'key'},
+            'status_code': response.status_code,
+            'text': response.text if method != 'HEAD' else '',
+            'elapsed': elapsed,
+        }
+        # Each record is its own gzip member, so an interrupted run leaves a readable archive
+        with self._lock, gzip.open(self.path, 'at', encoding='utf-8') as f:
+            f.write(json.dumps(exchange) + '\n')
+        return response
+
+    def _replay(self, method, url, params):
+        key = self._key(method, url, params)
+        with self._lock:
+            exchanges = self._recordings.get(key)
+            if not exchanges:
+                raise requests.ConnectionError(f"No recorded response for {method} {url}")
+            # Serve recordings in order, repeating the last once they run out
+            position = self._replay_positions.get(key, 0)
+            self._replay_positions[key] = position + 1
+            exchange = exchanges[min(position, len(exchanges) - 1)]
+        if self.replay_latency:
+            time.sleep(exchange['elapsed'])
+        return ReplayedResponse(url, exchange['status_code'], exchange['text'])
+
+@st.cache_resource
+def get_http_archive():
+    """
+    Return the archive used by every session served by this process, if recording or replaying.
+
+    Returns:
+        HttpArchive: The process-wide archive, or None when making live requests only.
+    """
+    if HTTP_MODE not in ('record', 'replay'):
+        return None
+    return HttpArchive(HTTP_ARCHIVE_PATH, HTTP_MODE, replay_latency=HTTP_REPLAY_LATENCY)
+
+def wait_between_requests(seconds):
+    """
+    Pause between API requests (page token activation, rate-limit politeness), except
+    when replaying recorded responses at full speed.
+
+    Parameters:
+        seconds (float): Seconds to wait.
+    """
+    if HTTP_MODE == 'replay' and not HTTP_REPLAY_LATENCY:
+        return
+    time.sleep(seconds)
+
+def http_get(url, params=None, **kwargs):
+    """
+    Issue a GET request through the record/replay layer.
+    """
+    archive = get_http_archive()
+    if archive is None:
+        return requests.get(url, params=params, **kwargs)
+    return archive.request('GET', url, params=params, **kwargs)
+
+def http_head(url, **kwargs):
+    """
+    Issue a HEAD request through the record/replay layer.
+    """
+    archive = get_http_archive()
+    if archive is None:
+        return requests.head(url, **kwargs)
+    return archive.request('HEAD', url, **kwargs)
+
+# Shared Cache
+
+# Process-wide cache limits and per-key time-to-live in seconds
+SHARED_CACHE_MAX_ENTRIES = 10000
+GEOCODE_CACHE_TTL = 24 * 60 * 60
+PLACE_DETAILS_CACHE_TTL = 60 * 60
+WEBSITE_CACHE_TTL = 60 * 60
+
+class SharedCache:
+    """
+    Thread-safe LRU cache with per-key TTL and single-flight request coalescing.
+
+    Concurrent lookups of the same key share one in-flight call: the first caller
+    computes the value while the others wait for its result instead of repeating it.
+    """
+
+    def __init__(self, max_entries=SHARED_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value), oldest first
+        self._in_flight = {}  # key -> {'done': threading.Event, 'value': ..., 'error': ...}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute, ttl, should_cache=None):
+        """
+        Return the cached value for key, computing it at most once across concurrent callers.
+
+        Parameters:
+            key (tuple): Hashable cache key.
+            compute (callable): Zero-argument function producing the value on a miss.
+            ttl (float): Seconds the computed value stays fresh.
+            should_cache (callable): Optional predicate; values it rejects (e.g. failures) are not stored.
+
+        Returns:
+            The cached or freshly computed value.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                del self._entries[key]
+            
+            flight = self._in_flight.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = {'done': threading.Event(), 'value': None, 'error': None}
+                self._in_flight[key] = flight
+        
+        # Followers wait for the leader's call instead of making their own
+        if not is_leader:
+            flight['done'].wait()
+            if flight['error'] is not None:
+                raise flight['error']
+            return flight['value']
+        
+        try:
+            value = compute()
+            flight['value'] = value
+        except BaseException as e:
+            flight['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                if flight['error'] is None and (should_cache is None or should_cache(flight['value'])):
+                    self._entries[key] = (time.monotonic() + ttl, flight['value'])
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            flight['done'].set()
+        return value
+
+    def clear(self):
+        """
+        Drop every cached entry. In-flight calls are left to finish.
+        """
+        with self._lock:
+            self._entries.clear()
+
+@st.cache_resource
+def get_shared_cache():
+    """
+    Return the cache shared by every session served by this Streamlit process.
+
+    Returns:
+        SharedCache: The process-wide cache instance.
+    """
+    return SharedCache()
+
+# Offline Gazetteer
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'gazetteer.csv')
+# A name shared by several places resolves offline only if one is this many times more populous
+GAZETTEER_MIN_POPULATION_RATIO = 10
+
+def normalize_place_name(text):
+    """
+    Normalize a place name for gazetteer lookups: strip accents and punctuation, lowercase.
+
+    Parameters:
+        text (str): Place name (e.g., "São Paulo, Brazil").
+
+    Returns:
+        str: Normalized name (e.g., "sao paulo brazil").
+    """
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(re.sub(r"[^a-z0-9]+", ' ', text.lower()).split())
+
+class Gazetteer:
+    """
+    Bundled list of known places, binary-searched by normalized name.
+
+    Each place is indexed under its name alone and qualified by its region and/or
+    country (full name or code), e.g. "sydney", "sydney nsw", "sydney new south wales australia".
+    """
+
+    def __init__(self, places):
+        self.places = places
+        keyed = sorted((key, idx) for idx, place in enumerate(places) for key in self._place_keys(place))
+        self._keys = [key for key, _ in keyed]
+        self._indices = [idx for _, idx in keyed]
+        # Region and country names, mapped to the places they contain
+        self._regions = {}
+        for idx, place in enumerate(places):
+            for region in (place['admin1'], place['country']):
+                self._regions.setdefault(normalize_place_name(region), set()).add(idx)
+
+    @classmethod
+    def load(cls, path=GAZETTEER_PATH):
+        """
+        Load a gazetteer CSV (name, admin1, admin1_code, country, country_code, lat, lng, population).
+
+        Parameters:
+            path (str): Path to the CSV file.
+
+        Returns:
+            Gazetteer: The loaded gazetteer (empty if the file does not exist).
+        """
+        places = []
+        if os.path.exists(path):
+            with open(path, newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    row['lat'] = float(row['lat'])
+                    row['lng'] = float(row['lng'])
+                    row['population'] = int(row['population'] or 0)
+                    places.append(row)
+        return cls(places)
+
+    @staticmethod
+    def _place_keys(place):
+        name = normalize_place_name(place['name'])
+        regions = {normalize_place_name(place['admin1']), normalize_place_name(place['admin1_code'])} - {''}
+        countries = {normalize_place_name(place['country']), normalize_place_name(place['country_code'])} - {''}
+        keys = {name}
+        keys.update(f"{name} {region}" for region in regions)
+        keys.update(f"{name} {country}" for country in countries)
+        keys.update(f"{name} {region} {country}" for region in regions for country in countries)
+        return keys
+
+    @staticmethod
+    def display_name(place):
+        """
+        Format a place as "Name, Region, Country".
+        """
+        parts = [place['name']]
+        if place['admin1'] and place['admin1'] != place['name']:
+            parts.append(place['admin1'])
+        if place['country'] != place['name']:
+            parts.append(place['country'])
+        return ', '.join(parts)
+
+    def _exact(self, key):
+        start = bisect.bisect_left(self._keys, key)
+        end = bisect.bisect_right(self._keys, key, lo=start)
+        return {self._indices[i] for i in range(start, end)}
+
+    def resolve(self, query):
+        """
+        Resolve a location string to coordinates if it confidently names one known place.
+
+        Parameters:
+            query (str): Location as typed by the user (e.g., "Sydney, Australia").
+
+        Returns:
+            tuple: (latitude, longitude), or None if the name is unknown or ambiguous.
+        """
+        key = normalize_place_name(query)
+        matches = self._exact(key)
+        if not matches:
+            return None
+        # "Victoria" could mean the Canadian city or the Australian state
+        if any(normalize_place_name(self.places[idx]['name']) != key for idx in self._regions.get(key, ())):
+            return None
+        ranked = sorted(matches, key=lambda idx: self.places[idx]['population'], reverse=True)
+        if len(ranked) > 1 and self.places[ranked[0]]['population'] < GAZETTEER_MIN_POPULATION_RATIO * self.places[ranked[1]]['population']:
+            return None
+        place = self.places[ranked[0]]
+        return (place['lat'], place['lng'])
+
+    def display_names(self):
+        """
+        Return the display names of every known place, most populous first and without repeats.
+        """
+        names = (self.display_name(place) for place in sorted(self.places, key=lambda place: place['population'], reverse=True))
+        return list(dict.fromkeys(names))
+
+@st.cache_resource
+def get_gazetteer():
+    """
+    Return the bundled gazetteer, loaded once per process.
+
+    Returns:
+        Gazetteer: The process-wide gazetteer.
+    """
+    return Gazetteer.load()
+
+# Exclusion List
+
+EXCLUSIONS_PATH = os.path.join(DATA_DIR, 'exclusions.json')
+
+# Column names recognised in uploaded exclusion lists (after normalize_place_name)
+EXCLUSION_COLUMNS = {
+    'place id': 'place_ids',
+    'placeid': 'place_ids',
+    'website': 'websites',
+    'url': 'websites',
+    'phone': 'phones',
+    'phone number': 'phones',
+    'formatted phone number': 'phones',
+}
+
+# International calling codes by length (ITU-T E.164); every other code has three digits
+ONE_DIGIT_CALLING_CODES = {'1', '7'}
+TWO_DIGIT_CALLING_CODES = {
+    '20', '27', '30', '31', '32', '33', '34', '36', '39', '40', '41', '43', '44', '45', '46', '47', '48', '49',
+    '51', '52', '53', '54', '55', '56', '57', '58', '60', '61', '62', '63', '64', '65', '66',
+    '81', '82', '84', '86', '90', '91', '92', '93', '94', '95', '98',
+}
+
+def normalize_website(url):
+    """
+    Normalize a website URL for exclusion matching: no scheme, "www." or trailing slash.
+
+    Parameters:
+        url (str): Website URL (e.g., "https://www.Example.com/").
+
+    Returns:
+        str: Normalized website (e.g., "example.com"), or None if empty.
+    """
+    if not url or url == 'N/A':
+        return None
+    url = re.sub(r"^[a-z][a-z0-9+.-]*://", '', url.strip().lower())
+    url = url.split('#')[0].split('?')[0].rstrip('/')
+    if url.startswith('www.'):
+        url = url[4:]
+    return url or None
+
+def normalize_phone(phone):
+    """
+    Normalize a phone number for exclusion matching.
+
+    The whole national number is kept, so national and international formats of the
+    same number match (e.g., "(02) 9999 1234" and "+61 2 9999 1234" both become
+    "299991234") while numbers that only share their last digits do not. Numbers
+    written with "+" or "00" lose their country calling code, then one leading trunk
+    "0" is dropped.
+
+    Parameters:
+        phone (str): Phone number in any format.
+
+    Returns:
+        str: Normalized phone number, or None if it has too few digits.
+    """
+    if not phone or phone == 'N/A':
+        return None
+    phone = phone.strip()
+    digits = re.sub(r"\D", '', phone)
+    if phone.startswith('+') or digits.startswith('00'):
+        if not phone.startswith('+'):
+            digits = digits[2:]
+        # Calling codes are prefix-free: 1 and 7 are the only one-digit codes, and any
+        # code that is not one of the two-digit ones has three digits
+        if digits[:1] in ONE_DIGIT_CALLING_CODES:
+            digits = digits[1:]
+        elif digits[:2] in TWO_DIGIT_CALLING_CODES:
+            digits = digits[2:]
+        else:
+            digits = digits[3:]
+    if digits.startswith('0'):
+        digits = digits[1:]
+    if len(digits) < 6:
+        return None
+    return digits
+
+class ExclusionIndex:
+    """
+    Businesses to leave out of every analysis (e.g. already contacted or already in the CRM).
+
+    Place IDs, normalized websites and normalized phone numbers are kept in sets and
+    persisted as JSON, so the list survives restarts and is shared by every session.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or EXCLUSIONS_PATH
+        self.place_ids = set()
+        self.websites = set()
+        self.phones = set()
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            self.place_ids = set(data.get('place_ids', []))
+            self.websites = set(data.get('websites', []))
+            self.phones = set(data.get('phones', []))
+
+    def __len__(self):
+        return len(self.place_ids) + len(self.websites) + len(self.phones)
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'place_ids': sorted(self.place_ids),
+                'websites': sorted(self.websites),
+                'phones': sorted(self.phones),
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def add(self, place_ids=(), websites=(), phones=(), replace=False):
+        """
+        Add entries to the exclusion list and persist it.
+
+        Parameters:
+            place_ids (iterable): Google Place IDs.
+            websites (iterable): Website URLs, in any format.
+            phones (iterable): Phone numbers, in any format.
+            replace (bool): Discard the existing entries first.
+        """
+        place_ids = {place_id.strip() for place_id in place_ids if place_id and place_id.strip()}
+        websites = {normalize_website(website) for website in websites} - {None}
+        phones = {normalize_phone(phone) for phone in phones} - {None}
+        with self._lock:
+            if replace:
+                self.place_ids, self.websites, self.phones = set(), set(), set()
+            self.place_ids |= place_ids
+            self.websites |= websites
+            self.phones |= phones
+            self._save()
+
+    def clear(self):
+        """
+        Remove every entry from the exclusion list.
+        """
+        self.add(replace=True)
+
+    def excludes_place(self, place_id):
+        """
+        Check whether a Place ID is excluded.
+        """
+        return place_id in self.place_ids
+
+    def excludes_contact(self, website=None, phone=None):
+        """
+        Check whether a website or phone number is excluded.
+        """
+        return (
+            normalize_website(website) in self.websites
+            or normalize_phone(phone) in self.phones
+        )
+
+    def excludes_row(self, row):
+        """
+        Check whether a result row (with 'Place ID', 'Website' and 'Phone' columns) is excluded.
+        """
+        return self.excludes_place(row.get('Place ID')) or self.excludes_contact(row.get('Website'), row.get('Phone'))
+
+def parse_exclusion_file(content):
+    """
+    Parse an uploaded exclusion list.
+
+    CSV files with Place ID, Website and/or Phone columns (such as this app's own CSV
+    download) are read by column. Otherwise every value is classified on its own:
+    URLs and domains as websites, mostly-numeric values as phone numbers and anything
+    else as a Place ID.
+
+    Parameters:
+        content (bytes): File contents.
+
+    Returns:
+        dict: {'place_ids': [...], 'websites': [...], 'phones': [...]}.
+    """
+    entries = {'place_ids': [], 'websites': [], 'phones': []}
+    rows = list(csv.reader(content.decode('utf-8-sig', errors='replace').splitlines()))
+    if not rows:
+        return entries
+    
+    header = [EXCLUSION_COLUMNS.get(normalize_place_name(cell)) for cell in rows[0]]
+    if any(header):
+        for row in rows[1:]:
+            for kind, value in zip(header, row):
+                if kind and value.strip():
+                    entries[kind].append(value.strip())
+        return entries
+    
+    for row in rows:
+        for value in row:
+            value = value.strip()
+            if not value:
+                continue
+            # Phone numbers first, since some are written with dots (e.g., "212.555.1234")
+            if re.fullmatch(r"[\d\s()+.-]+", value):
+                entries['phones'].append(value)
+            elif '.' in value or '/' in value:
+                entries['websites'].append(value)
+            else:
+                entries['place_ids'].append(value)
+    return entries
+
+def filter_excluded_businesses(businesses, exclusions):
+    """
+    Drop businesses whose Place ID is on the exclusion list, before any details are fetched.
+
+    Parameters:
+        businesses (list): List of business dictionaries from Places API.
+        exclusions (ExclusionIndex): Exclusion list, or None.
+
+    Returns:
+        list: Businesses that are not excluded.
+    """
+    if not exclusions:
+        return businesses
+    return [biz for biz in businesses if not exclusions.excludes_place(biz.get('place_id'))]
+
+@st.cache_resource
+def get_exclusion_index():
+    """
+    Return the exclusion list shared by every session served by this Streamlit process.
+
+    Returns:
+        ExclusionIndex: The process-wide exclusion list.
+    """
+    return ExclusionIndex()
+
 # Function Definitions
 
+class PlacesApiError(Exception):
+    """
+    Raised when a Google Maps API request fails in a way that should stop the analysis
+    (e.g. an invalid API key), so the job can report it instead of finishing empty.
+    """
+
 def haversine(lon1, lat1, lon2, lat2):
     """
     Calculate the great circle distance between two points on the earth (specified in decimal degrees).
@@ -31,50 +682,76 @@ def geocode_location(location_name, api_key):
     """
     Convert a location name to latitude and longitude using Google Geocoding API.
 
+    Locations the bundled gazetteer resolves confidently are answered offline. Other
+    results are shared across sessions through the process-wide cache, and concurrent
+    lookups of the same location share a single API call. Failed lookups are not cached.
+
     Parameters:
         location_name (str): The location name (e.g., "San Diego, California").
         api_key (str): Google Geocoding API key.
 
     Returns:
         tuple: (latitude, longitude) or (0.0, 0.0) if not found.
+
+    Raises:
+        PlacesApiError: If the request is denied or fails.
+    """
+    coordinates = get_gazetteer().resolve(location_name)
+    if coordinates is not None:
+        return coordinates
+    
+    return get_shared_cache().get_or_compute(
+        ('geocode', location_name.strip().lower()),
+        lambda: _geocode_location(location_name, api_key),
+        ttl=GEOCODE_CACHE_TTL,
+        should_cache=lambda result: result != (0.0, 0.0)
+    )
+
+def _geocode_location(location_name, api_key):
+    """
+    Uncached Geocoding API request behind geocode_location.
     """
-    GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+    GEOCODE_URL = f"{GOOGLE_MAPS_API_BASE_URL}/maps/api/geocode/json"
     params = {
         'address': location_name,
         'key': api_key
     }
     try:
-        response = requests.get(GEOCODE_URL, params=params)
+        response = http_get(GEOCODE_URL, params=params)
         data = response.json()
-        if data.get('status') == 'OK':
-            location = data['results'][0]['geometry']['location']
-            return (location['lat'], location['lng'])
-        else:
-            if data.get('status') == "REQUEST_DENIED":      
-                st.error("Request denied, check your API key and ensure you have an active billing account.")
-            else:
-                st.error(f"Geocoding failed for location: {location_name} with status: {data.get('status')}")
-            return (0.0, 0.0)
     except Exception as e:
-        st.error(f"Exception during geocoding: {e}")
+        raise PlacesApiError(f"Exception during geocoding: {e}") from e
+    
+    if data.get('status') == 'OK':
+        location = data['results'][0]['geometry']['location']
+        return (location['lat'], location['lng'])
+    elif data.get('status') == 'ZERO_RESULTS':
         return (0.0, 0.0)
+    elif data.get('status') == "REQUEST_DENIED":
+        raise PlacesApiError("Request denied, check your API key and ensure you have an active billing account.")
+    else:
+        raise PlacesApiError(f"Geocoding failed for location: {location_name} with status: {data.get('status')}")
 
-def fetch_businesses(keyword, location, radius, api_key, max_results=1):
+def iter_business_pages(keyword, location, radius, api_key):
     """
-    Fetch businesses from Google Places Nearby Search API based on a keyword and location.
-    
+    Lazily fetch pages of businesses from Google Places Nearby Search API.
+
+    Each page is only requested once the previous one has been consumed, so callers
+    that stop iterating early never pay for the remaining pages.
+
     Parameters:
         keyword (str): The search keyword (e.g., "painter").
         location (tuple): (latitude, longitude) of the base location.
         radius (int): Search radius in meters (max 50000 meters).
         api_key (str): Google Places API key.
-        max_results (int): Maximum number of results to fetch.
-    
-    Returns:
-        list: A list of business dictionaries.
+
+    Yields:
+        list: The business dictionaries of one results page.
+
+    Raises:
+        PlacesApiError: If a page cannot be fetched (e.g. the request is denied).
     """
-    PLACE_SEARCH_URL = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-    businesses = []
+    PLACE_SEARCH_URL = f"{GOOGLE_MAPS_API_BASE_URL}/maps/api/place/nearbysearch/json"
     params = {
         'keyword': keyword,
         'location': f"{location[0]},{location[1]}",
@@ -84,56 +761,96 @@ def fetch_businesses(keyword, location, radius, api_key, max_results=1):
     
     while True:
         try:
-            response = requests.get(PLACE_SEARCH_URL, params=params)
-            if response.status_code != 200:
-                st.error(f"Error fetching businesses: HTTP {response.status_code}")
-                break
-            
-            data = response.json()
-            status = data.get('status')
-            if status != 'OK' and status != 'ZERO_RESULTS':
-                st.error(f"API returned status: {status}")
-                if 'error_message' in data:
-                    st.error(f"Error message: {data['error_message']}")
-                break
-            
-            results = data.get('results', [])
-            for biz in results:
-                if len(businesses) >= max_results:
-                    # Removed the info message about reaching maximum limit
-                    return businesses
-                businesses.append(biz)
-            
-            # Handle pagination only if needed
-            next_page_token = data.get('next_page_token')
-            if next_page_token and len(businesses) < max_results:
-                time.sleep(2)  # Wait for the token to become active
-                params = {
-                    'pagetoken': next_page_token,
-                    'key': api_key
-                }
-            else:
-                break
+            response = http_get(PLACE_SEARCH_URL, params=params)
+            data = response.json() if response.status_code == 200 else None
         except Exception as e:
-            st.error(f"Exception occurred while fetching businesses: {e}")
+            raise PlacesApiError(f"Exception occurred while fetching businesses: {e}") from e
+        if data is None:
+            raise PlacesApiError(f"Error fetching businesses: HTTP {response.status_code}")
+        
+        status = data.get('status')
+        if status != 'OK' and status != 'ZERO_RESULTS':
+            message = f"API returned status: {status}"
+            if status == 'REQUEST_DENIED':
+                message += ". Check your API key and ensure you have an active billing account"
+            if 'error_message' in data:
+                message += f" ({data['error_message']})"
+            raise PlacesApiError(message)
+        
+        yield data.get('results', [])
+        
+        # Handle pagination only if the consumer asked for more
+        next_page_token = data.get('next_page_token')
+        if not next_page_token:
+            return
+        wait_between_requests(2)  # Wait for the token to become active
+        params = {
+            'pagetoken': next_page_token,
+            'key': api_key
+        }
+
+def fetch_businesses(keyword, location, radius, api_key, max_results=1):
+    """
+    Fetch businesses from Google Places Nearby Search API based on a keyword and location.
+    
+    Parameters:
+        keyword (str): The search keyword (e.g., "painter").
+        location (tuple): (latitude, longitude) of the base location.
+        radius (int): Search radius in meters (max 50000 meters).
+        api_key (str): Google Places API key.
+        max_results (int): Maximum number of results to fetch.
+    
+    Returns:
+        list: A list of business dictionaries.
+
+    Raises:
+        PlacesApiError: If a page cannot be fetched.
+    """
+    businesses = []
+    
+    for results in iter_business_pages(keyword, location, radius, api_key):
+        for biz in results:
+            if len(businesses) >= max_results:
+                # Removed the info message about reaching maximum limit
+                return businesses
+            businesses.append(biz)
+        
+        # Handle pagination only if needed
+        if len(businesses) >= max_results:
             break
     
-    st.success(f"Total businesses fetched: {len(businesses)}")
     return businesses
 
 def fetch_place_details(place_id, api_key, fields=['website', 'formatted_phone_number', 'rating', 'user_ratings_total', 'price_level', 'types', 'geometry', 'opening_hours', 'reviews']):
     """
     Fetch detailed information about a place using Place Details API.
 
+    Results are shared across sessions through the process-wide cache, and concurrent
+    requests for the same place share a single API call. Failed requests are not cached.
+
     Parameters:
         place_id (str): The unique identifier for a place.
         api_key (str): Google Places API key.
         fields (list): List of fields to retrieve.
 
     Returns:
-        dict: A dictionary containing the requested fields.
+        dict: A dictionary containing the requested fields, or an empty dictionary if the place no longer exists.
+
+    Raises:
+        PlacesApiError: If the request is denied or fails.
+    """
+    return get_shared_cache().get_or_compute(
+        ('place_details', place_id, tuple(fields)),
+        lambda: _fetch_place_details(place_id, api_key, fields),
+        ttl=PLACE_DETAILS_CACHE_TTL,
+        should_cache=bool
+    )
+
+def _fetch_place_details(place_id, api_key, fields):
     """
-    PLACE_DETAILS_URL = "https://maps.googleapis.com/maps/api/place/details/json"
+    Uncached Place Details API request behind fetch_place_details.
+    """
+    PLACE_DETAILS_URL = f"{GOOGLE_MAPS_API_BASE_URL}/maps/api/place/details/json"
     params = {
         'place_id': place_id,
         'fields': ','.join(fields),
@@ -141,48 +858,62 @@ def fetch_place_details(place_id, api_key, fields=['website', 'formatted_phone_n
     }
     
     try:
-        response = requests.get(PLACE_DETAILS_URL, params=params)
-        if response.status_code != 200:
-            st.warning(f"Error fetching place details for {place_id}: HTTP {response.status_code}")
-            return {}
-        
-        data = response.json()
-        status = data.get('status')
-        if status != 'OK':
-            st.warning(f"Place Details API returned status: {status} for Place ID: {place_id}")
-            if 'error_message' in data:
-                st.warning(f"Error message: {data['error_message']}")
-            return {}
-        
-        result = data.get('result', {})
-        return {
-            'website': result.get('website', 'N/A'),
-            'formatted_phone_number': result.get('formatted_phone_number', 'N/A'),
-            'rating': result.get('rating', 0),
-            'user_ratings_total': result.get('user_ratings_total', 0),
-            'price_level': result.get('price_level', 0),
-            'types': result.get('types', []),
-            'geometry': result.get('geometry', {}).get('location', {}),
-            'opening_hours': result.get('opening_hours', {}).get('open_now', False),
-            'reviews': result.get('reviews', [])
-        }
-        
+        response = http_get(PLACE_DETAILS_URL, params=params)
+        data = response.json() if response.status_code == 200 else None
     except Exception as e:
-        st.warning(f"Exception occurred while fetching place details for {place_id}: {e}")
-        return {}
+        raise PlacesApiError(f"Exception occurred while fetching place details for {place_id}: {e}") from e
+    if data is None:
+        raise PlacesApiError(f"Error fetching place details for {place_id}: HTTP {response.status_code}")
+    
+    status = data.get('status')
+    if status == 'NOT_FOUND':
+        return {}  # The place was removed since the search; skip it
+    if status != 'OK':
+        message = f"Place Details API returned status: {status} for Place ID: {place_id}"
+        if 'error_message' in data:
+            message += f" ({data['error_message']})"
+        raise PlacesApiError(message)
+    
+    result = data.get('result', {})
+    return {
+        'website': result.get('website', 'N/A'),
+        'formatted_phone_number': result.get('formatted_phone_number', 'N/A'),
+        'rating': result.get('rating', 0),
+        'user_ratings_total': result.get('user_ratings_total', 0),
+        'price_level': result.get('price_level', 0),
+        'types': result.get('types', []),
+        'geometry': result.get('geometry', {}).get('location', {}),
+        'opening_hours': result.get('opening_hours', {}).get('open_now', False),
+        'reviews': result.get('reviews', [])
+    }
 
 def verify_website(url):
     """
     Verify if a website URL is accessible.
 
+    Results are shared across sessions through the process-wide cache, and concurrent
+    checks of the same URL share a single request. Failed checks are not cached, so a
+    timeout does not mark a site inaccessible for every session.
+
     Parameters:
         url (str): The website URL to verify.
 
     Returns:
         bool: True if accessible, False otherwise.
     """
+    return get_shared_cache().get_or_compute(
+        ('website', url),
+        lambda: _verify_website(url),
+        ttl=WEBSITE_CACHE_TTL,
+        should_cache=bool
+    )
+
+def _verify_website(url):
+    """
+    Uncached accessibility check behind verify_website.
+    """
     try:
-        response = requests.head(url, allow_redirects=True, timeout=5)
+        response = http_head(url, allow_redirects=True, timeout=5)
         if response.status_code < 400:
             return True
         else:
@@ -255,72 +986,72 @@ def analyze_reviews(reviews, min_recent_reviews=1, min_average_rating=3.5, min_a
     
     return True
 
-def grade_business(
+# Grading criteria in the order used by feature and weight matrices
+GRADING_CRITERIA = [
+    'rating',
+    'user_ratings_total',
+    'reviews',
+    'website',
+    'formatted_phone_number',
+    'price_level',
+    'types',
+    'location_proximity',
+]
+
+DEFAULT_WEIGHTS = {
+    'rating': 20,
+    'user_ratings_total': 10,
+    'reviews': 20,
+    'website': 15,
+    'formatted_phone_number': 15,
+    'price_level': 10,
+    'types': 10,
+    'location_proximity': 5,
+}
+
+def score_criteria(
     biz_details, 
     target_types=[], 
     max_distance=50, 
-    base_location=(0,0), 
-    weights=None
+    base_location=(0,0)
 ):
     """
-    Grade the business based on predefined criteria.
+    Score a business on each grading criterion, before weights are applied.
 
     Parameters:
         biz_details (dict): Dictionary containing business details.
         target_types (list): List of desired business types.
         max_distance (float): Maximum distance in kilometers from base_location.
         base_location (tuple): (latitude, longitude) of the base location.
-        weights (dict): Dictionary of grading weights.
 
     Returns:
-        float: Total score out of 100.
+        dict: Score from 0 to 10 for each criterion in GRADING_CRITERIA.
         float: Distance from the base location in kilometers.
     """
-    # Set default weights if none provided
-    if weights is None:
-        weights = {
-            'rating': 20,
-            'user_ratings_total': 10,
-            'reviews': 20,
-            'website': 15,
-            'formatted_phone_number': 15,
-            'price_level': 10,
-            'types': 10,
-            'location_proximity': 5,
-        }
-    
-    total_score = 0
-    
     # 1. Business Rating
     rating = biz_details.get('rating', 0)  # 0 to 5
     rating_score = (rating / 5) * 10  # 0 to 10
-    total_score += rating_score * (weights.get('rating', 0) / 100)
     
     # 2. Number of User Ratings
     user_ratings_total = biz_details.get('user_ratings_total', 0)
     user_ratings_score = min((user_ratings_total / 100) * 10, 10)  # Cap at 10
-    total_score += user_ratings_score * (weights.get('user_ratings_total', 0) / 100)
     
     # 3. Review Analysis
     reviews = biz_details.get('reviews', [])
     reviews_meet_criteria = analyze_reviews(reviews)
     reviews_score = 10 if reviews_meet_criteria else 0
-    total_score += reviews_score * (weights.get('reviews', 0) / 100)
     
     # 4. Presence of Website
     website = biz_details.get('website', 'N/A')
     website_score = 10 if website != 'N/A' else 0
-    total_score += website_score * (weights.get('website', 0) / 100)
     
     # 5. Availability of Phone Number
     phone = biz_details.get('formatted_phone_number', 'N/A')
     phone_score = 10 if phone != 'N/A' else 0
-    total_score += phone_score * (weights.get('formatted_phone_number', 0) / 100)
     
     # 6. Price Level
     price_level = biz_details.get('price_level', 0)  # 0 to 4
     price_score = (price_level / 4) * 10  # 0 to 10
-    total_score += price_score * (weights.get('price_level', 0) / 100)
     
     # 7. Business Type
     types = biz_details.get('types', [])
@@ -329,7 +1060,6 @@ def grade_business(
         if t.lower() in [bt.lower() for bt in types]:
             type_score = 10
             break
-    total_score += type_score * (weights.get('types', 0) / 100)
     
     # 8. Location Proximity
     biz_lat = biz_details.get('geometry', {}).get('lat', 0)
@@ -340,11 +1070,89 @@ def grade_business(
         proximity_score = max(10 - (distance / max_distance) * 10, 0)
     else:
         proximity_score = 0
-    total_score += proximity_score * (weights.get('location_proximity', 0) / 100)
+    
+    criteria_scores = {
+        'rating': rating_score,
+        'user_ratings_total': user_ratings_score,
+        'reviews': reviews_score,
+        'website': website_score,
+        'formatted_phone_number': phone_score,
+        'price_level': price_score,
+        'types': type_score,
+        'location_proximity': proximity_score,
+    }
+    return criteria_scores, distance
+
+def weighted_grade(criteria_scores, weights=None):
+    """
+    Combine per-criterion scores into a grade using the given weights.
+
+    Parameters:
+        criteria_scores (dict): Scores from score_criteria.
+        weights (dict): Dictionary of grading weights.
+
+    Returns:
+        float: Total score out of 100.
+    """
+    # Set default weights if none provided
+    if weights is None:
+        weights = DEFAULT_WEIGHTS
+    
+    total_score = 0
+    for criterion in GRADING_CRITERIA:
+        total_score += criteria_scores[criterion] * (weights.get(criterion, 0) / 100)
     
     # Convert total_score to a percentage
-    total_score_percentage = total_score * 10  # Since each weight was out of 100
-    return total_score_percentage, distance  # Return distance for sorting
+    return total_score * 10  # Since each weight was out of 100
+
+def grade_business(
+    biz_details, 
+    target_types=[], 
+    max_distance=50, 
+    base_location=(0,0), 
+    weights=None
+):
+    """
+    Grade the business based on predefined criteria.
+
+    Parameters:
+        biz_details (dict): Dictionary containing business details.
+        target_types (list): List of desired business types.
+        max_distance (float): Maximum distance in kilometers from base_location.
+        base_location (tuple): (latitude, longitude) of the base location.
+        weights (dict): Dictionary of grading weights.
+
+    Returns:
+        float: Total score out of 100.
+        float: Distance from the base location in kilometers.
+    """
+    criteria_scores, distance = score_criteria(
+        biz_details, 
+        target_types=target_types, 
+        max_distance=max_distance, 
+        base_location=base_location
+    )
+    return weighted_grade(criteria_scores, weights), distance  # Return distance for sorting
+
+def is_duplicate_business(biz, seen):
+    """
+    Check whether a business is a duplicate of one already seen, based on name and address similarity.
+
+    Parameters:
+        biz (dict): Business dictionary from Places API.
+        seen (list): Business dictionaries that have already been kept.
+
+    Returns:
+        bool: True if the business duplicates one in seen, False otherwise.
+    """
+    name = biz.get('name', '').lower()
+    address = biz.get('vicinity', '').lower()
+    for seen_biz in seen:
+        name_similarity = SequenceMatcher(None, name, seen_biz['name']).ratio()
+        address_similarity = SequenceMatcher(None, address, seen_biz['vicinity'].lower()).ratio()
+        if name_similarity > 0.9 and address_similarity > 0.9:
+            return True
+    return False
 
 def merge_businesses(businesses):
     """
@@ -357,331 +1165,958 @@ def merge_businesses(businesses):
         list: Merged list of unique business dictionaries.
     """
     unique_businesses = []
-    seen = []
     for biz in businesses:
-        name = biz.get('name', '').lower()
-        address = biz.get('vicinity', '').lower()
-        is_duplicate = False
-        for seen_biz in seen:
-            name_similarity = SequenceMatcher(None, name, seen_biz['name']).ratio()
-            address_similarity = SequenceMatcher(None, address, seen_biz['vicinity'].lower()).ratio()
-            if name_similarity > 0.9 and address_similarity > 0.9:
-                is_duplicate = True
-                break
-        if not is_duplicate:
+        if not is_duplicate_business(biz, unique_businesses):
             unique_businesses.append(biz)
-            seen.append(biz)
     return unique_businesses
 
-def save_businesses_to_csv(
-    businesses, 
-    target_types=[], 
-    base_location=(0,0), 
-    max_distance=50, 
-    grade_threshold=50, 
-    weights=None, 
-    progress_bar=None, 
-    progress_text=None, 
-    table_placeholder=None,
-    selected_columns=None  # New parameter for selected CSV columns
-):
+def analyze_business(biz, api_key, target_types=[], base_location=(0,0), max_distance=50, weights=None, exclusions=None):
     """
-    Compile business data into a DataFrame and allow user to download it as CSV.
+    Fetch details for a single business, verify its website and grade it.
 
     Parameters:
-        businesses (list): List of business dictionaries from Places API.
+        biz (dict): Business dictionary from Places API.
+        api_key (str): Google Places API key.
         target_types (list): List of desired business types for grading.
         base_location (tuple): (latitude, longitude) of the base location for proximity.
         max_distance (float): Maximum distance in kilometers for proximity scoring.
-        grade_threshold (float): Minimum grade score to include in the CSV.
         weights (dict): Dictionary of grading weights.
-        progress_bar (st.progress): Streamlit progress bar object.
-        progress_text (st.empty): Streamlit text placeholder for progress updates.
-        table_placeholder (st.empty): Streamlit placeholder for the dynamic table.
-        selected_columns (list): List of columns selected by the user for the CSV.
+        exclusions (ExclusionIndex): Businesses whose website or phone is listed are skipped.
 
     Returns:
-        pd.DataFrame: DataFrame containing qualified businesses.
+        dict: Row with every CSV column, or None if the place details could not be fetched or the business is excluded.
+        dict: Unweighted score for each grading criterion, or None if there is no row.
     """
-    data = []
-    total = len(businesses)
+    place_id = biz.get('place_id')
     
-    # Initialize progress bar
-    if progress_bar is not None:
-        progress_bar.progress(0)
+    # Fetch Place Details
+    details = fetch_place_details(place_id, api_key=api_key)
+    if not details:
+        return None, None
     
-    # Define default columns if none are selected
-    if not selected_columns:
-        selected_columns = [
-            'Name', 'Address', 'Phone', 'Website', 'Website Accessible', 
-            'Grade Score', 'Distance (km)', 'Google Maps URL', 'Place ID'
-        ]
+    website = details.get('website', 'N/A')
     
-    # Initialize empty DataFrame with selected columns
-    if table_placeholder is not None:
-        temp_df = pd.DataFrame(columns=selected_columns)
-        table_placeholder.dataframe(temp_df)
+    # Skip excluded businesses before spending a website check on them
+    if exclusions and exclusions.excludes_contact(website, details.get('formatted_phone_number')):
+        return None, None
     
-    for idx, biz in enumerate(businesses, start=1):
-        name = biz.get('name')
-        address = biz.get('vicinity')
-        place_id = biz.get('place_id')
-        
+    # Verify Website Accessibility
+    website_accessible = 'Yes' if website != 'N/A' and verify_website(website) else 'No'
+    
+    # Grade the business
+    criteria_scores, distance = score_criteria(
+        details, 
+        target_types=target_types, 
+        max_distance=max_distance, 
+        base_location=base_location
+    )
+    grade = weighted_grade(criteria_scores, weights)
+    
+    row = {
+        'Name': biz.get('name'),
+        'Address': biz.get('vicinity'),
+        'Phone': details.get('formatted_phone_number', 'N/A'),
+        'Website': website,
+        'Website Accessible': website_accessible,
+        'Grade Score': grade,
+        'Distance (km)': round(distance, 2),
         # Construct the Google Maps URL using place_id
-        maps_url = f"https://www.google.com/maps/place/?q=place_id:{place_id}"
-        
-        # Fetch Place Details
-        details = fetch_place_details(place_id, api_key=user_api_key)
-        if not details:
+        'Google Maps URL': f"https://www.google.com/maps/place/?q=place_id:{place_id}",
+        'Place ID': place_id
+    }
+    return row, criteria_scores
+
+# Weight Scenarios
+
+# Scenarios graded and ranked per block; small enough to stay in CPU cache
+SWEEP_BLOCK_SIZE = 16
+# Businesses checked together for Pareto optimality
+PARETO_BLOCK_SIZE = 256
+
+# Named weight presets for scenario sweeps
+WEIGHT_PRESETS = {
+    'Default': DEFAULT_WEIGHTS,
+    'Reputation': {'rating': 35, 'user_ratings_total': 25, 'reviews': 30, 'website': 0, 'formatted_phone_number': 5, 'price_level': 0, 'types': 5, 'location_proximity': 0},
+    'Contactable': {'rating': 10, 'user_ratings_total': 5, 'reviews': 5, 'website': 30, 'formatted_phone_number': 30, 'price_level': 5, 'types': 10, 'location_proximity': 5},
+    'Local': {'rating': 15, 'user_ratings_total': 5, 'reviews': 10, 'website': 10, 'formatted_phone_number': 10, 'price_level': 0, 'types': 10, 'location_proximity': 40},
+    'Premium': {'rating': 20, 'user_ratings_total': 10, 'reviews': 15, 'website': 10, 'formatted_phone_number': 5, 'price_level': 35, 'types': 5, 'location_proximity': 0},
+}
+
+def generate_weight_grid(levels=(0, 25, 50)):
+    """
+    Generate every combination of the given weight levels across the grading criteria.
+
+    Parameters:
+        levels (tuple): Weight values each criterion can take.
+
+    Returns:
+        dict: Scenario name mapped to a weights dictionary (the all-zero combination is skipped).
+    """
+    scenarios = {}
+    for combination in itertools.product(levels, repeat=len(GRADING_CRITERIA)):
+        if not any(combination):
             continue
+        scenarios[f"Grid {len(scenarios) + 1}"] = dict(zip(GRADING_CRITERIA, combination))
+    return scenarios
+
+def criteria_matrix(criteria_scores_list):
+    """
+    Stack per-criterion scores into a feature matrix.
+
+    Parameters:
+        criteria_scores_list (list): Score dictionaries from score_criteria, one per business.
+
+    Returns:
+        np.ndarray: (businesses x criteria) matrix in GRADING_CRITERIA order.
+    """
+    return np.array(
+        [[scores[criterion] for criterion in GRADING_CRITERIA] for scores in criteria_scores_list],
+        dtype=float
+    ).reshape(len(criteria_scores_list), len(GRADING_CRITERIA))
+
+def weights_matrix(scenarios):
+    """
+    Stack weight dictionaries into a weight matrix.
+
+    Parameters:
+        scenarios (dict): Scenario name mapped to a weights dictionary.
+
+    Returns:
+        np.ndarray: (scenarios x criteria) matrix in GRADING_CRITERIA order.
+    """
+    return np.array(
+        [[weights.get(criterion, 0) for criterion in GRADING_CRITERIA] for weights in scenarios.values()],
+        dtype=float
+    ).reshape(len(scenarios), len(GRADING_CRITERIA))
+
+def pareto_optimal(features):
+    """
+    Find the businesses no other business beats on every criterion.
+
+    Since weights are never negative, a business outside this set can never rank first
+    under any weight scenario.
+
+    Parameters:
+        features (np.ndarray): (businesses x criteria) feature matrix.
+
+    Returns:
+        np.ndarray: Boolean mask of Pareto-optimal businesses.
+    """
+    # Identical businesses never dominate each other, so only distinct rows are compared
+    # and any other row at least as good on every criterion is strictly better
+    distinct, inverse = np.unique(features, axis=0, return_inverse=True)
+    is_optimal = np.zeros(len(distinct), dtype=bool)
+    # The front is kept one row per criterion, so each comparison is a flat 2-D operation
+    front = np.empty((distinct.shape[1], len(distinct)), dtype=distinct.dtype)
+    front_size = 0
+    # A dominating business always has a larger total, so it is visited first. Businesses
+    # are checked a block at a time against the front so far and against each other.
+    order = np.argsort(-distinct.sum(axis=1), kind='stable')
+    for start in range(0, len(order), PARETO_BLOCK_SIZE):
+        block_indices = order[start:start + PARETO_BLOCK_SIZE]
+        block = distinct[block_indices]
+        dominated = np.zeros(len(block), dtype=bool)
+        for others, is_block in ((front[:, :front_size], False), (block.T, True)):
+            at_least = np.ones((len(block), others.shape[1]), dtype=bool)
+            for criterion, values in enumerate(others):
+                at_least &= values[np.newaxis] >= block[:, criterion, np.newaxis]
+            if is_block:
+                np.fill_diagonal(at_least, False)
+            dominated |= at_least.any(axis=1)
+        survivors = block[~dominated]
+        front[:, front_size:front_size + len(survivors)] = survivors.T
+        front_size += len(survivors)
+        is_optimal[block_indices[~dominated]] = True
+    return is_optimal[inverse.reshape(-1)]
+
+def rank_rows(values):
+    """
+    Rank the values in each row, highest first; tied values share the best rank.
+
+    Each value's bit pattern (which sorts like the value itself, as values are not
+    negative) is packed with its position into one uint64 key, so a single sort gives
+    both the order and the sorted values.
+
+    Parameters:
+        values (np.ndarray): C-contiguous (rows x columns) float32 matrix of non-negative values,
+            with fewer than 2**32 entries.
+
+    Returns:
+        np.ndarray: (rows x columns) int32 ranks, 1 being the best.
+    """
+    rows, columns = values.shape
+    # Both halves of each key are written and read in place through a uint32 view
+    keys = np.empty((rows, columns), dtype=np.uint64)
+    halves = keys.view(np.uint32).reshape(rows, columns, 2)
+    low, high = (0, 1) if sys.byteorder == 'little' else (1, 0)
+    np.invert(values.view(np.uint32), out=halves[:, :, high])  # Inverted, so the highest value sorts first
+    # The low half holds the flat position, which keeps the order within each row
+    halves[:, :, low] = np.arange(rows * columns, dtype=np.uint32).reshape(rows, columns)
+    keys.sort(axis=1)
+    
+    sorted_values = halves[:, :, high]
+    is_new_value = np.empty(keys.shape, dtype=bool)
+    is_new_value[:, 0] = True
+    np.not_equal(sorted_values[:, 1:], sorted_values[:, :-1], out=is_new_value[:, 1:])
+    sorted_ranks = np.where(is_new_value, np.arange(1, columns + 1, dtype=np.int32), np.int32(0))
+    np.maximum.accumulate(sorted_ranks, axis=1, out=sorted_ranks)
+    
+    ranks = np.empty(rows * columns, dtype=np.int32)
+    ranks[halves[:, :, low].astype(np.intp).ravel()] = sorted_ranks.ravel()
+    return ranks.reshape(rows, columns)
+
+def sweep_weight_scenarios(features, scenarios, top_k=10):
+    """
+    Grade every business under every weight scenario with blocked matrix products.
+
+    Grades are computed in float32 (the same arithmetic as weighted_grade, to about six
+    significant digits), and scenarios are graded and ranked a block at a time so each
+    block is still in CPU cache while it is sorted.
+
+    Parameters:
+        features (np.ndarray): (businesses x criteria) matrix from criteria_matrix.
+        scenarios (dict): Scenario name mapped to a weights dictionary.
+        top_k (int): Shortlist size, also used for the top-k rate.
+
+    Returns:
+        pd.DataFrame: Grade Score per business (rows) and scenario (columns).
+        pd.DataFrame: Rank per business and scenario, 1 being the best.
+        pd.DataFrame: Per-business summary with rank statistics, Pareto optimality and
+            the consensus shortlist, sorted by consensus rank.
+    """
+    names = list(scenarios)
+    # weighted_grade computes sum(score * weight / 100) * 10, i.e. weights @ (scores / 10)
+    weights = weights_matrix(scenarios).astype(np.float32)
+    scaled_features = np.ascontiguousarray(features.T / 10, dtype=np.float32)
+    grades = np.empty((len(names), len(features)), dtype=np.float32)
+    ranks = np.empty(grades.shape, dtype=np.int32)
+    for start in range(0, len(names), SWEEP_BLOCK_SIZE):
+        block = slice(start, start + SWEEP_BLOCK_SIZE)
+        np.matmul(weights[block], scaled_features, out=grades[block])
+        ranks[block] = rank_rows(grades[block])
+    
+    median_rank = np.median(ranks, axis=0)
+    mean_rank = ranks.mean(axis=0)
+    # Variance from the mean square, without a float64 copy of every rank
+    mean_square_rank = np.einsum('ij,ij->j', ranks, ranks, dtype=np.float64) / max(len(names), 1)
+    rank_std = np.sqrt(np.maximum(mean_square_rank - mean_rank ** 2, 0))
+    consensus_order = np.lexsort((mean_rank, median_rank))
+    consensus_rank = np.empty(len(features), dtype=int)
+    consensus_rank[consensus_order] = np.arange(1, len(features) + 1)
+    is_pareto = pareto_optimal(features)
+    
+    summary = pd.DataFrame({
+        'Consensus Rank': consensus_rank,
+        'Median Rank': median_rank,
+        'Mean Rank': mean_rank,
+        'Rank Std': rank_std,
+        'Best Rank': ranks.min(axis=0),
+        'Worst Rank': ranks.max(axis=0),
+        f'Top {top_k} Rate': np.count_nonzero(ranks <= top_k, axis=0) / max(len(names), 1),
+        'Pareto Optimal': is_pareto,
+        'Shortlisted': is_pareto & (consensus_rank <= top_k),
+    })
+    summary.sort_values(by='Consensus Rank', inplace=True)
+    # Both matrices are new, so the frames can wrap them instead of copying 2 x 4 bytes per grade
+    return pd.DataFrame(grades.T, columns=names, copy=False), pd.DataFrame(ranks.T, columns=names, copy=False), summary
+
+# Background Jobs
+
+JOB_WORKERS = 4
+JOB_POLL_INTERVAL = 2  # Seconds between status refreshes in the UI
+JOB_MAX_AGE = timedelta(days=7)  # Jobs untouched for longer are deleted, so old results are fetched again
+SEARCH_RADIUS = 50000  # 50 km
+MAX_DISTANCE_KM = 50
+
+class JobStore:
+    """
+    Persist analysis jobs on disk so they survive reruns, refreshes and restarts.
+
+    Each job has a JSON metadata file (parameters, status, fetched businesses) and a
+    JSON-lines checkpoint with one record per analyzed business. Job IDs are derived
+    from the job parameters, so submitting the same analysis again resumes it.
+    """
+
+    def __init__(self, root=None, max_age=JOB_MAX_AGE):
+        self.root = root or os.path.join(DATA_DIR, 'jobs')
+        self.max_age = max_age
+        os.makedirs(self.root, exist_ok=True)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def job_id_for(params):
+        """
+        Derive a stable job ID from the job parameters.
+
+        Parameters:
+            params (dict): JSON-serializable job parameters.
+
+        Returns:
+            str: Job ID.
+        """
+        return hashlib.sha1(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+    def _meta_path(self, job_id):
+        return os.path.join(self.root, f"{job_id}.json")
+
+    def _results_path(self, job_id):
+        return os.path.join(self.root, f"{job_id}.jsonl")
+
+    def create(self, params):
+        """
+        Create a job for the given parameters, or return the existing one.
+
+        A job that completed without analyzing any business is started afresh rather than
+        reused, since its empty search may have been a transient API problem. Jobs not
+        updated for max_age are deleted first, so stale results are never reused and the
+        store does not grow without limit.
+
+        Parameters:
+            params (dict): JSON-serializable job parameters.
+
+        Returns:
+            str: Job ID.
+        """
+        job_id = self.job_id_for(params)
+        with self._lock:
+            self._delete_expired()
+            meta = self.load(job_id)
+            if meta is not None and meta['status'] == 'completed' and not self.load_results(job_id):
+                os.remove(self._meta_path(job_id))
+                meta = None
+            if meta is None:
+                now = datetime.now().isoformat(timespec='seconds')
+                self._save(job_id, {
+                    'job_id': job_id,
+                    'params': params,
+                    'status': 'queued',
+                    'error': None,
+                    'base_location': None,
+                    'businesses': None,
+                    'total': None,
+                    'created_at': now,
+                    'updated_at': now
+                })
+        return job_id
+
+    def _delete_expired(self):
+        cutoff = datetime.now() - self.max_age
+        for name in os.listdir(self.root):
+            if not name.endswith('.json'):
+                continue
+            job_id = name[:-len('.json')]
+            meta = self.load(job_id)
+            if meta is not None and datetime.fromisoformat(meta['updated_at']) < cutoff:
+                self._remove(job_id)
+
+    def _remove(self, job_id):
+        for path in (self._meta_path(job_id), self._results_path(job_id)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def load(self, job_id):
+        """
+        Load a job's metadata.
+
+        Parameters:
+            job_id (str): Job ID.
+
+        Returns:
+            dict: Job metadata, or None if the job does not exist.
+        """
+        try:
+            with open(self._meta_path(job_id), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _save(self, job_id, meta):
+        # Write to a temporary file first so readers never see a half-written job
+        tmp_path = self._meta_path(job_id) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._meta_path(job_id))
+
+    def update(self, job_id, **fields):
+        """
+        Update fields of a job's metadata.
+
+        Parameters:
+            job_id (str): Job ID.
+            **fields: Metadata fields to set.
+        """
+        with self._lock:
+            meta = self.load(job_id)
+            meta.update(fields)
+            meta['updated_at'] = datetime.now().isoformat(timespec='seconds')
+            self._save(job_id, meta)
+
+    def append_result(self, job_id, record):
+        """
+        Checkpoint the result for one business.
+
+        Parameters:
+            job_id (str): Job ID.
+            record (dict): {'place_id': ..., 'row': ..., 'scores': ...} where row and scores are None if details could not be fetched.
+        """
+        path = self._results_path(job_id)
+        # Cut off a line left half-written by an interrupted run, or this record would be appended to it
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb+') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    f.seek(0)
+                    f.truncate(f.read().rfind(b'\n') + 1)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def load_results(self, job_id):
+        """
+        Load every checkpointed result of a job.
+
+        Parameters:
+            job_id (str): Job ID.
+
+        Returns:
+            list: Result records in the order they were analyzed.
+        """
+        results = []
+        try:
+            with open(self._results_path(job_id), encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        results.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue  # Partially written line from an interrupted run
+        except FileNotFoundError:
+            pass
+        return results
+
+    def delete(self, job_id):
+        """
+        Remove a job and its checkpoint.
+
+        Parameters:
+            job_id (str): Job ID.
+        """
+        with self._lock:
+            self._remove(job_id)
+
+def qualified_rows(results, grade_threshold, exclusions=None):
+    """
+    Extract the rows of checkpointed results that meet the grade threshold.
+
+    Parameters:
+        results (list): Result records from JobStore.load_results.
+        grade_threshold (float): Minimum grade score.
+        exclusions (ExclusionIndex): Businesses to leave out, including ones excluded after they were analyzed.
+
+    Returns:
+        list: Business rows meeting the threshold.
+    """
+    return [
+        r['row'] for r in results 
+        if r['row'] is not None and r['row']['Grade Score'] >= grade_threshold 
+        and not (exclusions and exclusions.excludes_row(r['row']))
+    ]
+
+def iter_job_businesses(store, job_id, api_key, exclusions=None):
+    """
+    Yield the candidate businesses of a job.
+
+    In fetch mode the deduplicated Nearby Search results are stored with the job, so a
+    resumed job does not search again. In qualified mode pages are streamed lazily.
+
+    Parameters:
+        store (JobStore): Job store.
+        job_id (str): Job ID.
+        api_key (str): Google Places API key.
+        exclusions (ExclusionIndex): Exclusion list; businesses with an excluded Place ID are not yielded.
+
+    Yields:
+        dict: Business dictionaries from Places API.
+    """
+    meta = store.load(job_id)
+    params = meta['params']
+    base_location = tuple(meta['base_location'])
+    
+    if params['results_mode'] == 'qualified':
+        seen = []
+        for results in iter_business_pages(params['industry'], base_location, SEARCH_RADIUS, api_key):
+            for biz in results:
+                if is_duplicate_business(biz, seen):
+                    continue
+                seen.append(biz)
+                if exclusions and exclusions.excludes_place(biz.get('place_id')):
+                    continue
+                yield biz
+    else:
+        businesses = meta['businesses']
+        if businesses is None:
+            businesses = merge_businesses(fetch_businesses(
+                keyword=params['industry'], 
+                location=base_location, 
+                radius=SEARCH_RADIUS, 
+                api_key=api_key, 
+                max_results=params['num_results']
+            ))
+            businesses = filter_excluded_businesses(businesses, exclusions)
+            store.update(job_id, businesses=businesses, total=len(businesses))
+        yield from businesses
+
+def run_analysis_job(store, job_id, api_key, exclusions=None):
+    """
+    Run (or resume) an analysis job, checkpointing each business as it completes.
+
+    Businesses already in the checkpoint are skipped, so a job interrupted by a crash or
+    restart picks up where it stopped.
+
+    Parameters:
+        store (JobStore): Job store.
+        job_id (str): Job ID.
+        api_key (str): Google Places API key.
+        exclusions (ExclusionIndex): Businesses to leave out.
+
+    Returns:
+        dict: Final job metadata.
+    """
+    meta = store.load(job_id)
+    params = meta['params']
+    target_count = params['num_results']
+    grade_threshold = params['grade_threshold']
+    is_qualified_mode = params['results_mode'] == 'qualified'
+    
+    results = store.load_results(job_id)
+    done = {r['place_id'] for r in results}
+    qualified = len(qualified_rows(results, grade_threshold, exclusions))
+    
+    store.update(job_id, status='running', error=None)
+    try:
+        # Geocode once; resumed jobs reuse the stored location
+        if meta['base_location'] is None:
+            base_location = geocode_location(params['location'], api_key)
+            if base_location == (0.0, 0.0):
+                store.update(job_id, status='failed', error="Geocoding failed. Please check your location input.")
+                return store.load(job_id)
+            store.update(job_id, base_location=list(base_location))
+        else:
+            base_location = tuple(meta['base_location'])
+        if is_qualified_mode:
+            store.update(job_id, total=target_count)
         
-        website = details.get('website', 'N/A')
-        phone = details.get('formatted_phone_number', 'N/A')
-        reviews = details.get('reviews', [])
-        
-        # Verify Website Accessibility
-        website_accessible = 'Yes' if website != 'N/A' and verify_website(website) else 'No'
-        
-        # Grade the business
-        grade, distance = grade_business(
-            details, 
-            target_types=target_types, 
-            max_distance=max_distance, 
-            base_location=base_location, 
-            weights=weights
-        )
-        
-        # Apply grade threshold
-        if grade < grade_threshold:
-            continue  # Skip adding to the CSV
-        
-        # Append to data
-        business_data = {
-            'Name': name,
-            'Address': address,
-            'Phone': phone,
-            'Website': website,
-            'Website Accessible': website_accessible,
-            'Grade Score': grade,
-            'Distance (km)': round(distance, 2),
-            'Google Maps URL': maps_url,
-            'Place ID': place_id
-        }
-        
-        # Only include selected columns
-        filtered_business_data = {key: value for key, value in business_data.items() if key in selected_columns}
-        data.append(filtered_business_data)
-        
-        # Update progress
-        if progress_bar is not None:
-            progress = idx / total
-            progress_bar.progress(progress)
-        if progress_text is not None:
-            progress_text.text(f"Processing business {idx} of {total}...")
-        
-        # Update the table dynamically using pd.concat
-        if table_placeholder is not None:
-            # Create a DataFrame for the current business
-            current_df = pd.DataFrame([filtered_business_data])
-            # Concatenate with the existing temp_df
-            temp_df = pd.concat([temp_df, current_df], ignore_index=True)
-            # Update the table in Streamlit
-            table_placeholder.dataframe(temp_df)
+        if not (is_qualified_mode and qualified >= target_count):
+            for biz in iter_job_businesses(store, job_id, api_key, exclusions):
+                place_id = biz.get('place_id')
+                if place_id in done:
+                    continue
+                
+                row, criteria_scores = analyze_business(
+                    biz, 
+                    api_key=api_key, 
+                    target_types=[params['industry'].lower()], 
+                    base_location=base_location, 
+                    max_distance=MAX_DISTANCE_KM, 
+                    weights=params['weights'], 
+                    exclusions=exclusions
+                )
+                store.append_result(job_id, {'place_id': place_id, 'row': row, 'scores': criteria_scores})
+                done.add(place_id)
+                if row is not None and row['Grade Score'] >= grade_threshold:
+                    qualified += 1
+                
+                # Stop all fetching once enough businesses qualify
+                if is_qualified_mode and qualified >= target_count:
+                    break
+                
+                # Politeness delay to avoid hitting rate limits
+                wait_between_requests(1)
         
-        # Politeness delay to avoid hitting rate limits
-        time.sleep(1)
+        store.update(job_id, status='completed')
+    except PlacesApiError as e:
+        store.update(job_id, status='failed', error=str(e))
+    except Exception as e:
+        store.update(job_id, status='failed', error=f"Exception occurred while running job: {e}")
+    return store.load(job_id)
+
+class JobRunner:
+    """
+    Run analysis jobs on a local worker pool, at most one run per job at a time.
+    """
+
+    def __init__(self, store, exclusions=None, max_workers=JOB_WORKERS):
+        self.store = store
+        self.exclusions = exclusions
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis-job')
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, job_id, api_key):
+        """
+        Queue a job, or return the run already in progress for it.
+
+        Parameters:
+            job_id (str): Job ID.
+            api_key (str): Google Places API key.
+
+        Returns:
+            concurrent.futures.Future: The job's run.
+        """
+        with self._lock:
+            future = self._futures.get(job_id)
+            if future is None or future.done():
+                self.store.update(job_id, status='queued', error=None)
+                future = self._executor.submit(run_analysis_job, self.store, job_id, api_key, self.exclusions)
+                self._futures[job_id] = future
+            return future
+
+    def is_active(self, job_id):
+        """
+        Check whether a job is queued or running in this process.
+
+        Parameters:
+            job_id (str): Job ID.
+
+        Returns:
+            bool: True if the job has an unfinished run.
+        """
+        with self._lock:
+            future = self._futures.get(job_id)
+            return future is not None and not future.done()
+
+@st.cache_resource
+def get_job_store():
+    """
+    Return the job store shared by every session served by this Streamlit process.
+
+    Returns:
+        JobStore: The process-wide job store.
+    """
+    return JobStore()
+
+@st.cache_resource
+def get_job_runner():
+    """
+    Return the worker pool shared by every session served by this Streamlit process.
+
+    Returns:
+        JobRunner: The process-wide job runner.
+    """
+    return JobRunner(get_job_store(), exclusions=get_exclusion_index())
+
+# Streamlit App Layout
+
+RESULTS_MODES = {
+    "Fetch N businesses": 'fetch',
+    "Find N qualified businesses": 'qualified',
+}
+
+def render_job(job_id, selected_columns, poll):
+    """
+    Show a job's status and its partial or final results.
+
+    Parameters:
+        job_id (str): Job ID.
+        selected_columns (list): List of columns selected by the user for the CSV.
+        poll (bool): Whether this render is a periodic refresh of an unfinished job.
+    """
+    store = get_job_store()
+    meta = store.load(job_id)
+    if meta is None:
+        return
+    params = meta['params']
+    results = store.load_results(job_id)
+    active = get_job_runner().is_active(job_id)
     
-    # Finalize progress
-    if progress_bar is not None:
-        progress_bar.progress(100)
-    if progress_text is not None:
-        progress_text.text("Processing complete!")
+    # Stop polling once the job has finished
+    if poll and not active:
+        st.rerun()
     
-    if data:
-        df = pd.DataFrame(data)
+    rows = qualified_rows(results, params['grade_threshold'], get_exclusion_index())
+    if rows:
+        df = pd.DataFrame(rows)
         # Sort by Grade Score (descending) and Distance (ascending)
         df.sort_values(by=['Grade Score', 'Distance (km)'], ascending=[False, True], inplace=True)
-        return df
+        if params['results_mode'] == 'qualified':
+            df = df.head(params['num_results'])
+        df = df[[column for column in df.columns if column in (selected_columns or df.columns)]]
+    else:
+        df = pd.DataFrame()
+    
+    total = meta['total']
+    if params['results_mode'] == 'qualified':
+        progress = min(len(rows), total) / total if total else 0
+        progress_label = f"Found {len(rows)} of {total} qualified business(es) after analyzing {len(results)}..."
+    else:
+        progress = len(results) / total if total else 0
+        progress_label = f"Processing business {len(results)} of {total if total is not None else '?'}..."
+    
+    if meta['status'] == 'failed':
+        st.error(meta['error'])
+    elif meta['status'] == 'completed':
+        st.progress(100)
+        st.text(f"Processing complete! Analyzed {len(results)} business(es).")
+    elif active:
+        st.progress(progress)
+        st.text(progress_label)
+    else:
+        st.warning("This analysis was interrupted. Submit the form again with the same settings to resume it from its checkpoint.")
+    
+    st.dataframe(df)
+    
+    if df.empty:
+        if meta['status'] == 'completed':
+            if params['results_mode'] == 'fetch' and total == 0:
+                st.warning("No businesses fetched.")
+            else:
+                st.warning("No businesses met the grade threshold.")
     else:
-        return pd.DataFrame()
+        if meta['status'] == 'completed':
+            st.success(f"Found {len(df)} business(es) that meet or exceed the grade threshold.")
+        
+        # Display the download button below the table
+        csv = df.to_csv(index=False)
+        st.download_button(
+            label="📥 Download as CSV",
+            data=csv,
+            file_name='businesses.csv',
+            mime='text/csv',
+        )
+    
+    if meta['status'] == 'completed':
+        render_weight_scenarios(results)
 
-# Streamlit App Layout
+def render_weight_scenarios(results):
+    """
+    Let the user rank a finished job's businesses under many weight scenarios at once.
 
-st.set_page_config(page_title="Business Analyzer", layout="wide")
+    Parameters:
+        results (list): Result records from JobStore.load_results.
+    """
+    exclusions = get_exclusion_index()
+    scored = [r for r in results if r.get('scores') is not None and not exclusions.excludes_row(r['row'])]
+    if not scored:
+        return
+    
+    with st.expander("🧪 Weight Scenarios"):
+        st.markdown("Rank every analyzed business under several weight presets at once (including those below the grade threshold) to see which leads stay near the top whatever the weights.")
+        presets = st.multiselect("Presets", options=list(WEIGHT_PRESETS), default=list(WEIGHT_PRESETS))
+        include_grid = st.checkbox("Include a generated grid of weights", help="Adds every combination of 0, 25 and 50 across the eight criteria.")
+        top_k = st.number_input("Shortlist Size", min_value=1, max_value=len(scored), value=min(10, len(scored)), step=1)
+        
+        scenarios = {name: WEIGHT_PRESETS[name] for name in presets}
+        if include_grid:
+            scenarios.update(generate_weight_grid())
+        if not scenarios:
+            st.warning("Please select at least one preset.")
+            return
+        
+        features = criteria_matrix([r['scores'] for r in scored])
+        grades, ranks, summary = sweep_weight_scenarios(features, scenarios, top_k=int(top_k))
+        st.text(f"Scored {len(scored)} business(es) under {len(scenarios)} scenario(s).")
+        
+        businesses = pd.DataFrame([{'Name': r['row']['Name'], 'Place ID': r['place_id']} for r in scored])
+        preset_ranks = ranks[[name for name in presets]].add_suffix(' Rank')
+        st.dataframe(businesses.join(summary).join(preset_ranks).loc[summary.index], hide_index=True)
+
+def use_known_location():
+    """
+    Copy the chosen known location into the Location input when the form is submitted,
+    then clear the selection so the form always shows the location that was searched.
+    """
+    if st.session_state.get('known_location'):
+        st.session_state['location'] = st.session_state['known_location']
+        st.session_state['known_location'] = None
 
-st.markdown("# 📈 Business Analyzer by [@DamonDevelops](https://damon-develops.tech)")
+def main():
+    st.set_page_config(page_title="Business Analyzer", layout="wide")
 
-button(username="damonDevelops", floating=False, width=300, font="Poppins")
+    st.markdown("# 📈 Business Analyzer by [@DamonDevelops](https://damon-develops.tech)")
 
-st.markdown("""
-I built this application to assist me in looking for potential clients for my web development business [Revamp Web Studios](https://www.revampwebstudio.com.au). The tool works by analysing nearby Google Places and assesses them based on weighted criteria to determine which are the best to approach. Enter your **Google Places API Key**, **Location**, **Industry**, and configure your grading preferences to get started. If you like the webapp and it helped you out at all, if you can afford to leave me a tip I'd greatly appreciate it :)!
-""")
+    button(username="damonDevelops", floating=False, width=300, font="Poppins")
 
-with st.form("business_form"):
-    st.subheader("🔧 Configuration")
-    user_api_key = st.text_input("🔑 Google Places API Key", type="password", help="Enter your Google Places API Key.")
-    location = st.text_input("📍 Location", value="Sydney, Australia", help="Enter your location (e.g., 'Sydney, Australia').")
-    industry = st.text_input("🏢 Industry Type", value="painter", help="Enter the industry type (e.g., 'painter').")
+    st.markdown("""
+    I built this application to assist me in looking for potential clients for my web development business [Revamp Web Studios](https://www.revampwebstudio.com.au). The tool works by analysing nearby Google Places and assesses them based on weighted criteria to determine which are the best to approach. Enter your **Google Places API Key**, **Location**, **Industry**, and configure your grading preferences to get started. If you like the webapp and it helped you out at all, if you can afford to leave me a tip I'd greatly appreciate it :)!
+    """)
+
+    with st.form("business_form"):
+        st.subheader("🔧 Configuration")
+        user_api_key = st.text_input("🔑 Google Places API Key", type="password", help="Enter your Google Places API Key.")
+        # The default is set through Session State because use_known_location writes to this input
+        st.session_state.setdefault('location', "Sydney, Australia")
+        location = st.text_input("📍 Location", key='location', help="Enter your location (e.g., 'Sydney, Australia').")
+        st.selectbox(
+            "🗺️ Known Location (optional)", 
+            options=get_gazetteer().display_names(), 
+            index=None, 
+            key='known_location', 
+            placeholder="Start typing to search known cities...", 
+            help="Pick a known city to search instead of the location above. It replaces the location when you submit. Known cities are located without calling the Geocoding API."
+        )
+        industry = st.text_input("🏢 Industry Type", value="painter", help="Enter the industry type (e.g., 'painter').")
     
-    # 1. Allow user to specify the number of results (max 50)
-    num_results = st.number_input(
-        "📊 Number of Results", 
-        min_value=1, 
-        max_value=50, 
-        value=10, 
-        step=1, 
-        help="Enter the number of businesses to fetch (max 50)."
-    )
-    if num_results == 50:
-        st.warning("Fetching 50 businesses may take some time. Please be patient.")
-
-    # 3. Allow user to set grade threshold
-    grade_threshold = st.number_input(
-        "📈 Grade Threshold", 
-        min_value=0.0, 
-        max_value=100.0, 
-        value=50.0, 
-        step=0.5, 
-        help="Minimum grade score to include in the results."
-    )
+        # 1. Allow user to specify the number of results (max 50)
+        results_mode = st.radio(
+            "🎯 Results Mode", 
+            options=["Fetch N businesses", "Find N qualified businesses"], 
+            horizontal=True, 
+            help="Fetch a fixed number of businesses and grade them all, or keep fetching until N businesses meet the grade threshold."
+        )
+        num_results = st.number_input(
+            "📊 Number of Results", 
+            min_value=1, 
+            max_value=50, 
+            value=10, 
+            step=1, 
+            help="Enter the number of businesses to fetch, or the number of qualified businesses to find (max 50)."
+        )
+        if num_results == 50:
+            st.warning("Fetching 50 businesses may take some time. Please be patient.")
+
+        # 3. Allow user to set grade threshold
+        grade_threshold = st.number_input(
+            "📈 Grade Threshold", 
+            min_value=0.0, 
+            max_value=100.0, 
+            value=50.0, 
+            step=0.5, 
+            help="Minimum grade score to include in the results."
+        )
     
-    # 2. Optional Grading Weights Customization using Expander
-    with st.expander("🛠️ Customize Grading Weights"):
-        st.markdown("Adjust the weights to prioritize different criteria during grading. The total weight does not need to sum up to 100, as each criterion is scored independently.")
+        # 2. Optional Grading Weights Customization using Expander
+        with st.expander("🛠️ Customize Grading Weights"):
+            st.markdown("Adjust the weights to prioritize different criteria during grading. The total weight does not need to sum up to 100, as each criterion is scored independently.")
         
-        # Allow users to change grading weights
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            rating_weight = st.slider("⭐ Rating Weight", min_value=0, max_value=50, value=20, step=1, help="Weight for business rating.")
-        with col2:
-            user_ratings_weight = st.slider("📝 User Ratings Weight", min_value=0, max_value=50, value=10, step=1, help="Weight for number of user ratings.")
-        with col3:
-            reviews_weight = st.slider("🗣️ Reviews Weight", min_value=0, max_value=50, value=20, step=1, help="Weight for review analysis.")
-        with col4:
-            website_weight = st.slider("🌐 Website Weight", min_value=0, max_value=50, value=15, step=1, help="Weight for website presence.")
+            # Allow users to change grading weights
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                rating_weight = st.slider("⭐ Rating Weight", min_value=0, max_value=50, value=20, step=1, help="Weight for business rating.")
+            with col2:
+                user_ratings_weight = st.slider("📝 User Ratings Weight", min_value=0, max_value=50, value=10, step=1, help="Weight for number of user ratings.")
+            with col3:
+                reviews_weight = st.slider("🗣️ Reviews Weight", min_value=0, max_value=50, value=20, step=1, help="Weight for review analysis.")
+            with col4:
+                website_weight = st.slider("🌐 Website Weight", min_value=0, max_value=50, value=15, step=1, help="Weight for website presence.")
         
-        col5, col6, col7, col8 = st.columns(4)
-        with col5:
-            phone_weight = st.slider("📞 Phone Weight", min_value=0, max_value=50, value=15, step=1, help="Weight for phone number availability.")
-        with col6:
-            price_weight = st.slider("💲 Price Level Weight", min_value=0, max_value=50, value=10, step=1, help="Weight for price level.")
-        with col7:
-            types_weight = st.slider("🛠️ Business Type Weight", min_value=0, max_value=50, value=10, step=1, help="Weight for business type.")
-        with col8:
-            proximity_weight = st.slider("📍 Proximity Weight", min_value=0, max_value=50, value=5, step=1, help="Weight for location proximity.")
+            col5, col6, col7, col8 = st.columns(4)
+            with col5:
+                phone_weight = st.slider("📞 Phone Weight", min_value=0, max_value=50, value=15, step=1, help="Weight for phone number availability.")
+            with col6:
+                price_weight = st.slider("💲 Price Level Weight", min_value=0, max_value=50, value=10, step=1, help="Weight for price level.")
+            with col7:
+                types_weight = st.slider("🛠️ Business Type Weight", min_value=0, max_value=50, value=10, step=1, help="Weight for business type.")
+            with col8:
+                proximity_weight = st.slider("📍 Proximity Weight", min_value=0, max_value=50, value=5, step=1, help="Weight for location proximity.")
         
-        # Collect weights into a dictionary
-        grading_weights = {
-            'rating': rating_weight,
-            'user_ratings_total': user_ratings_weight,
-            'reviews': reviews_weight,
-            'website': website_weight,
-            'formatted_phone_number': phone_weight,
-            'price_level': price_weight,
-            'types': types_weight,
-            'location_proximity': proximity_weight,
-        }
+            # Collect weights into a dictionary
+            grading_weights = {
+                'rating': rating_weight,
+                'user_ratings_total': user_ratings_weight,
+                'reviews': reviews_weight,
+                'website': website_weight,
+                'formatted_phone_number': phone_weight,
+                'price_level': price_weight,
+                'types': types_weight,
+                'location_proximity': proximity_weight,
+            }
     
-    # 4. Optional CSV Columns Customization using Expander
-    with st.expander("📋 Customize CSV Columns"):
-        st.markdown("Select the columns you wish to include in your CSV download.")
+        # 4. Optional CSV Columns Customization using Expander
+        with st.expander("📋 Customize CSV Columns"):
+            st.markdown("Select the columns you wish to include in your CSV download.")
         
-        # Define available columns
-        available_columns = [
-            'Name', 
-            'Address', 
-            'Phone', 
-            'Website', 
-            'Website Accessible', 
-            'Grade Score', 
-            'Distance (km)', 
-            'Google Maps URL', 
-            'Place ID'
-        ]
+            # Define available columns
+            available_columns = [
+                'Name', 
+                'Address', 
+                'Phone', 
+                'Website', 
+                'Website Accessible', 
+                'Grade Score', 
+                'Distance (km)', 
+                'Google Maps URL', 
+                'Place ID'
+            ]
         
-        # Create checkboxes for each column, default to True
-        selected_columns = []
-        for column in available_columns:
-            if st.checkbox(column, value=True):
-                selected_columns.append(column)
+            # Create checkboxes for each column, default to True
+            selected_columns = []
+            for column in available_columns:
+                if st.checkbox(column, value=True):
+                    selected_columns.append(column)
         
-        # Ensure at least one column is selected
-        if not selected_columns:
-            st.warning("Please select at least one column for the CSV.")
-    
-    submit_button = st.form_submit_button(label="Analyze Businesses")
-
-if submit_button:
-    if not user_api_key:
-        st.error("Please enter your Google Places API Key.")
-    elif not location:
-        st.error("Please enter a valid location.")
-    elif not industry:
-        st.error("Please enter an industry type.")
-    elif 'selected_columns' in locals() and not selected_columns:
-        st.error("Please select at least one CSV column.")
-    else:
-        # Geocode the location
-        with st.spinner('Geocoding the location...'):
-            base_location = geocode_location(location, user_api_key)
-       
-        if base_location == (0.0, 0.0):
-            st.warning("Geocoding failed. Please check your location input.")
+            # Ensure at least one column is selected
+            if not selected_columns:
+                st.warning("Please select at least one column for the CSV.")
+        
+        # 5. Optional exclusion list of businesses already contacted or in the CRM
+        with st.expander("🚫 Exclusion List"):
+            exclusions = get_exclusion_index()
+            st.markdown(f"Businesses on this list are left out of every analysis. Place IDs are skipped before any details are fetched; websites and phone numbers can only be matched once a business's details have been fetched. It currently holds {len(exclusions.place_ids)} Place ID(s), {len(exclusions.websites)} website(s) and {len(exclusions.phones)} phone number(s).")
+            exclusion_file = st.file_uploader(
+                "Upload Exclusion List", 
+                type=['csv', 'txt'], 
+                help="A CSV with Place ID, Website and/or Phone columns (such as a previous download from this app), or a plain list of Place IDs, websites and phone numbers."
+            )
+            replace_exclusions = st.checkbox("Replace the saved list instead of adding to it", help="Upload an empty file with this ticked to clear the list.")
+    
+        submit_button = st.form_submit_button(label="Analyze Businesses", on_click=use_known_location)
+
+    if submit_button:
+        if exclusion_file is not None:
+            entries = parse_exclusion_file(exclusion_file.getvalue())
+            get_exclusion_index().add(**entries, replace=replace_exclusions)
+            st.success(f"Exclusion list updated with {sum(len(values) for values in entries.values())} entries.")
+        
+        if not user_api_key:
+            st.error("Please enter your Google Places API Key.")
+        elif not location:
+            st.error("Please enter a valid location.")
+        elif not industry:
+            st.error("Please enter an industry type.")
+        elif not selected_columns:
+            st.error("Please select at least one CSV column.")
         else:
-            # Define search parameters
-            max_results = min(int(num_results), 50)  # Ensure max_results does not exceed 50
-            radius = 50000  # 50 km
-            target_types = [industry.lower()]
+            params = {
+                'location': location,
+                'industry': industry,
+                'num_results': min(int(num_results), 50),  # Ensure max_results does not exceed 50
+                'results_mode': RESULTS_MODES[results_mode],
+                'grade_threshold': grade_threshold,
+                'weights': grading_weights,
+            }
+            store = get_job_store()
+            job_id = store.create(params)
+            # Completed jobs are shown as they are; anything else is (re)started from its checkpoint
+            if store.load(job_id)['status'] != 'completed':
+                get_job_runner().submit(job_id, user_api_key)
+            st.session_state['job_id'] = job_id
             
-            st.info(f"Searching for '{industry}' in '{location}' within {radius/1000} km for up to {max_results} business(es)...")
-            
-            # Fetch businesses
-            with st.spinner('Fetching businesses from Google Places API...'):
-                businesses = fetch_businesses(
-                    keyword=industry, 
-                    location=base_location, 
-                    radius=radius, 
-                    api_key=user_api_key, 
-                    max_results=max_results
-                )
-            
-            if not businesses:
-                st.warning("No businesses fetched.")
+            if params['results_mode'] == 'qualified':
+                st.info(f"Searching for '{industry}' in '{location}' within {SEARCH_RADIUS/1000} km until {params['num_results']} business(es) meet the grade threshold...")
             else:
-                # Deduplicate businesses
-                unique_businesses = merge_businesses(businesses)
-                # Removed the message about unique businesses after deduplication
-                
-                # Initialize placeholders for progress and table
-                progress_bar = st.progress(0)
-                progress_text = st.empty()
-                table_placeholder = st.empty()
-                
-                # Analyze and grade businesses with progress updates
-                with st.spinner('Analyzing and grading businesses...'):
-                    df = save_businesses_to_csv(
-                        unique_businesses, 
-                        target_types=target_types, 
-                        base_location=base_location, 
-                        max_distance=50,
-                        grade_threshold=grade_threshold,
-                        weights=grading_weights,
-                        progress_bar=progress_bar,
-                        progress_text=progress_text,
-                        table_placeholder=table_placeholder,
-                        selected_columns=selected_columns  # Pass selected columns to the function
-                    )
-                
-                if df.empty:
-                    st.warning("No businesses met the grade threshold.")
+                st.info(f"Searching for '{industry}' in '{location}' within {SEARCH_RADIUS/1000} km for up to {params['num_results']} business(es)...")
+    
+    job_id = st.session_state.get('job_id')
+    if job_id is not None:
+        if get_job_runner().is_active(job_id):
+            # Refresh only the results panel while the job runs in the background
+            st.fragment(render_job, run_every=JOB_POLL_INTERVAL)(job_id, selected_columns, poll=True)
+        else:
+            render_job(job_id, selected_columns, poll=False)
+            
+            store = get_job_store()
+            meta = store.load(job_id)
+            if meta is not None and meta['status'] == 'completed':
+                analyzed_at = datetime.fromisoformat(meta['updated_at'])
+                st.caption(f"These results were analyzed on {analyzed_at:%d %b %Y at %H:%M} and are reused for {JOB_MAX_AGE.days} days. Start fresh to fetch the latest data.")
+            if meta is not None and st.button("🔄 Start Fresh", help="Discard the saved results of this analysis and run it again."):
+                if not user_api_key:
+                    st.error("Please enter your Google Places API Key.")
                 else:
-                    st.success(f"Found {len(df)} business(es) that meet or exceed the grade threshold.")
-                    
-                    # Display the download button below the table
-                    csv = df.to_csv(index=False)
-                    st.download_button(
-                        label="📥 Download as CSV",
-                        data=csv,
-                        file_name='businesses.csv',
-                        mime='text/csv',
-                    )
+                    store.delete(job_id)
+                    job_id = store.create(meta['params'])
+                    get_job_runner().submit(job_id, user_api_key)
+                    st.rerun()
+
+if __name__ == "__main__":
+    main()
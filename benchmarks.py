@@ -0,0 +1,289 @@
+# benchmarks.py
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from Business_Analyzer import analyze_reviews, grade_business, haversine, is_recent, merge_businesses, sentiment_score
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks_baseline.json")
+DEFAULT_SIZES = [10, 100, 1000, 100000]
+DEFAULT_THRESHOLD = 25.0  # Percent
+MIN_ROUND_TIME = 0.5  # Seconds of timed rounds per benchmark and size
+ALLOCATION_SLACK = 16  # KB of peak growth that never counts as a regression
+
+BASE_LOCATION = (-33.8688, 151.2093)
+TARGET_TYPES = ['painter']
+REVIEW_TEXTS = [
+    "Great service, friendly staff and a tidy finish. Would hire again.",
+    "Turned up late and left a mess behind. Not impressed.",
+    "Fair price for the job, nothing special.",
+    "Absolutely fantastic work, the house looks brand new!",
+    "Terrible communication and the quote kept changing.",
+    "",
+]
+STREETS = ["George St", "Pitt St", "King St", "Oxford St", "Crown St", "Victoria Rd"]
+
+def make_reviews(rng, count):
+    """
+    Build synthetic Place Details reviews, roughly two thirds within the last year.
+    """
+    now = datetime.now(tz=timezone.utc)
+    return [
+        {
+            'rating': rng.randint(1, 5),
+            'text': rng.choice(REVIEW_TEXTS),
+            'time_created': (now - timedelta(days=rng.randint(0, 540))).strftime("%Y-%m-%dT%H:%M:%S%z"),
+        }
+        for _ in range(count)
+    ]
+
+def make_business_details(rng):
+    """
+    Build one synthetic Place Details result in the shape grade_business expects.
+    """
+    details = {
+        'rating': round(rng.uniform(1, 5), 1),
+        'user_ratings_total': rng.randint(0, 300),
+        'price_level': rng.randint(0, 4),
+        'types': rng.choice([['painter', 'point_of_interest'], ['general_contractor', 'establishment'], []]),
+        'geometry': {'lat': BASE_LOCATION[0] + rng.uniform(-0.5, 0.5), 'lng': BASE_LOCATION[1] + rng.uniform(-0.5, 0.5)},
+        'reviews': make_reviews(rng, rng.randint(0, 5)),
+    }
+    if rng.random() < 0.6:
+        details['website'] = "https://example.com/"
+    if rng.random() < 0.8:
+        details['formatted_phone_number'] = "02 9999 0000"
+    return details
+
+def make_search_results(rng, size):
+    """
+    Build Nearby Search results where about one in ten repeats an earlier business
+    with slightly different formatting, as overlapping keyword searches do.
+    """
+    results = []
+    for i in range(size):
+        if results and rng.random() < 0.1:
+            original = rng.choice(results)
+            results.append({'name': original['name'] + ".", 'vicinity': original['vicinity'], 'place_id': f"dup{i}"})
+        else:
+            results.append({
+                'name': f"Business {i} Painting Services",
+                'vicinity': f"{rng.randint(1, 999)} {rng.choice(STREETS)}, Sydney",
+                'place_id': f"p{i}",
+            })
+    return results
+
+def setup_haversine(rng, size):
+    points = [(rng.uniform(-180, 180), rng.uniform(-90, 90)) for _ in range(size)]
+    def run():
+        for lng, lat in points:
+            haversine(BASE_LOCATION[1], BASE_LOCATION[0], lng, lat)
+    return run
+
+def setup_is_recent(rng, size):
+    times = [review['time_created'] for review in make_reviews(rng, size)]
+    def run():
+        for time_created in times:
+            is_recent(time_created)
+    return run
+
+def setup_sentiment_score(rng, size):
+    texts = [rng.choice(REVIEW_TEXTS) for _ in range(size)]
+    def run():
+        for text in texts:
+            sentiment_score(text)
+    return run
+
+def setup_analyze_reviews(rng, size):
+    review_lists = [make_reviews(rng, rng.randint(0, 5)) for _ in range(size)]
+    def run():
+        for reviews in review_lists:
+            analyze_reviews(reviews)
+    return run
+
+def setup_grade_business(rng, size):
+    businesses = [make_business_details(rng) for _ in range(size)]
+    def run():
+        for biz_details in businesses:
+            grade_business(biz_details, target_types=TARGET_TYPES, max_distance=50, base_location=BASE_LOCATION)
+    return run
+
+def setup_merge_businesses(rng, size):
+    results = make_search_results(rng, size)
+    def run():
+        merge_businesses(results)
+    return run
+
+# Name -> (fixture setup, largest size run by default). Sizes above the cap are only
+# run with --full: TextBlob costs ~0.3 ms per review and merge_businesses is quadratic
+# (~2 minutes per pass at 1k), so 100k of those would take minutes to days.
+BENCHMARKS = {
+    'haversine': (setup_haversine, None),
+    'is_recent': (setup_is_recent, None),
+    'sentiment_score': (setup_sentiment_score, 1000),
+    'analyze_reviews': (setup_analyze_reviews, 1000),
+    'grade_business': (setup_grade_business, 1000),
+    'merge_businesses': (setup_merge_businesses, 100),
+}
+
+def run_benchmark(setup, size, min_time=MIN_ROUND_TIME):
+    """
+    Time one benchmark at one fixture size and measure its allocations.
+
+    Parameters:
+        setup (callable): Builds the fixture and returns a function that processes all of it.
+        size (int): Number of items in the fixture.
+        min_time (float): Keep running timed rounds until this many seconds have passed.
+
+    Returns:
+        dict: Operations per second (best round), peak memory allocated during a pass and round count.
+    """
+    # Same fixture on every run, so results are comparable with the baseline
+    run = setup(random.Random(size), size)
+
+    # The first pass warms up caches and lazy imports; it only counts if it is too slow to repeat
+    start = time.perf_counter()
+    run()
+    best = time.perf_counter() - start
+    rounds = 1
+    if best < 10 * min_time:
+        best = float('inf')
+        rounds = 0
+        started = time.perf_counter()
+        while rounds < 3 or time.perf_counter() - started < min_time:
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+            rounds += 1
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'ops_per_sec': size / best,
+        'peak_kb': peak / 1024,
+        'rounds': rounds,
+    }
+
+def compare(results, baseline, threshold):
+    """
+    Compare benchmark results with the baseline.
+
+    Parameters:
+        results (dict): "name[size]" -> result from run_benchmark.
+        baseline (dict): Saved results in the same shape.
+        threshold (float): Percent slowdown or allocation growth allowed.
+
+    Returns:
+        list: (key, description) for each regression.
+    """
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        base = baseline[key]
+        slowdown = (1 - result['ops_per_sec'] / base['ops_per_sec']) * 100
+        if slowdown > threshold:
+            regressions.append((key, f"{key}: {slowdown:.1f}% slower ({base['ops_per_sec']:,.0f} -> {result['ops_per_sec']:,.0f} ops/sec)"))
+        growth = result['peak_kb'] - base['peak_kb']
+        if growth > ALLOCATION_SLACK and growth / max(base['peak_kb'], 1) * 100 > threshold:
+            regressions.append((key, f"{key}: {growth / max(base['peak_kb'], 1) * 100:.1f}% more memory ({base['peak_kb']:,.1f} -> {result['peak_kb']:,.1f} KB peak)"))
+    return regressions
+
+def environment():
+    return f"{platform.system()} {platform.machine()}, Python {platform.python_version()}"
+
+def format_change(result, base):
+    if base is None:
+        return "new"
+    return f"{(result['ops_per_sec'] / base['ops_per_sec'] - 1) * 100:+.1f}%"
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the pure hot-path functions in Business_Analyzer.py on synthetic fixtures "
+                    "and compare ops/sec and allocations with a saved baseline."
+    )
+    parser.add_argument("--only", help="Comma-separated benchmark names to run (default: all).")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES), help="Comma-separated fixture sizes.")
+    parser.add_argument("--full", action="store_true", help="Also run sizes above each benchmark's default cap.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Percent slowdown or allocation growth that fails the run.")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file.")
+    parser.add_argument("--update-baseline", action="store_true", help="Save these results as the new baseline instead of comparing.")
+    parser.add_argument("--min-time", type=float, default=MIN_ROUND_TIME, help="Seconds of timed rounds per benchmark and size.")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        sys.exit(f"Unknown benchmark(s): {', '.join(unknown)}. Choose from {', '.join(BENCHMARKS)}.")
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            saved = json.load(f)
+        baseline = saved['results']
+        if not args.update_baseline and saved.get('environment') != environment():
+            print(f"Note: the baseline was recorded on {saved.get('environment')}; timings may not be comparable.", file=sys.stderr)
+
+    print(f"{'Benchmark':<24} {'Size':>7} {'Ops/sec':>14} {'Peak KB':>10} {'vs baseline':>12}")
+    results = {}
+    cases = {}
+    for name in names:
+        setup, max_size = BENCHMARKS[name]
+        for size in sizes:
+            if max_size is not None and size > max_size and not args.full:
+                continue
+            key = f"{name}[{size}]"
+            cases[key] = (setup, size)
+            result = run_benchmark(setup, size, args.min_time)
+            results[key] = result
+            print(f"{name:<24} {size:>7} {result['ops_per_sec']:>14,.0f} {result['peak_kb']:>10,.1f} {format_change(result, baseline.get(key)):>12}")
+
+    if args.update_baseline:
+        # Keep entries that were not re-run (e.g. with --only)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump({
+                'environment': environment(),
+                'recorded': datetime.now().isoformat(timespec='seconds'),
+                'results': baseline,
+            }, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Saved {len(results)} result(s) to {args.baseline}.")
+        return
+
+    if not baseline:
+        print("No baseline found. Run with --update-baseline to record one.")
+        return
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        # Timings are noisy on shared machines, so a regression has to show up twice
+        print(f"\nRe-running {len(regressions)} possible regression(s)...")
+        for key in {key for key, _ in regressions}:
+            setup, size = cases[key]
+            retry = run_benchmark(setup, size, args.min_time)
+            results[key] = {
+                'ops_per_sec': max(results[key]['ops_per_sec'], retry['ops_per_sec']),
+                'peak_kb': min(results[key]['peak_kb'], retry['peak_kb']),
+                'rounds': results[key]['rounds'] + retry['rounds'],
+            }
+        regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) past {args.threshold:g}%:")
+        for _, description in regressions:
+            print(f"  {description}")
+        sys.exit(1)
+    print(f"\nNo regressions past {args.threshold:g}%.")
+
+if __name__ == "__main__":
+    main()
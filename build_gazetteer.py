@@ -0,0 +1,122 @@
+# build_gazetteer.py
+
+import argparse
+import csv
+import os
+
+from Business_Analyzer import normalize_place_name
+
+OUTPUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gazetteer.csv")
+COLUMNS = ['name', 'admin1', 'admin1_code', 'country', 'country_code', 'lat', 'lng', 'population']
+
+# GeoNames numbers the states and provinces of these countries; people write the postal abbreviation
+POSTAL_ABBREVIATIONS = {
+    'AU': {
+        'Australian Capital Territory': 'ACT',
+        'New South Wales': 'NSW',
+        'Northern Territory': 'NT',
+        'Queensland': 'QLD',
+        'South Australia': 'SA',
+        'Tasmania': 'TAS',
+        'Victoria': 'VIC',
+        'Western Australia': 'WA',
+    },
+    'CA': {
+        'Alberta': 'AB',
+        'British Columbia': 'BC',
+        'Manitoba': 'MB',
+        'New Brunswick': 'NB',
+        'Newfoundland and Labrador': 'NL',
+        'Northwest Territories': 'NT',
+        'Nova Scotia': 'NS',
+        'Nunavut': 'NU',
+        'Ontario': 'ON',
+        'Prince Edward Island': 'PE',
+        'Quebec': 'QC',
+        'Saskatchewan': 'SK',
+        'Yukon': 'YT',
+    },
+}
+
+def read_tsv(path):
+    """
+    Yield the rows of a GeoNames tab-separated file, skipping comments.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            yield line.rstrip("\n").split("\t")
+
+def region_code(country_code, admin1_name, admin1_code):
+    """
+    Return the abbreviation people use for a first-level region, or "" if it has none.
+
+    Parameters:
+        country_code (str): ISO country code.
+        admin1_name (str): Region name from admin1CodesASCII.txt.
+        admin1_code (str): GeoNames admin1 code.
+
+    Returns:
+        str: The postal abbreviation, the GeoNames code if it is alphabetic (e.g. "CA", "SCT"), or "".
+    """
+    abbreviation = POSTAL_ABBREVIATIONS.get(country_code, {}).get(admin1_name)
+    if abbreviation:
+        return abbreviation
+    # Numeric and alphanumeric codes (e.g. "13" for Tokyo) would only cause false matches
+    return admin1_code if admin1_code.isalpha() else ""
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rebuild data/gazetteer.csv from GeoNames dumps (https://download.geonames.org/export/dump/), "
+                    "e.g. cities15000.txt, admin1CodesASCII.txt and countryInfo.txt."
+    )
+    parser.add_argument("cities", help="GeoNames cities file (e.g. cities15000.txt).")
+    parser.add_argument("admin1", help="GeoNames admin1CodesASCII.txt.")
+    parser.add_argument("countries", help="GeoNames countryInfo.txt.")
+    parser.add_argument("--min-population", type=int, default=100000, help="Skip places smaller than this, unless they share a name with a larger place.")
+    parser.add_argument("--countries-only", help="Comma-separated ISO country codes to keep (e.g. 'AU,NZ').")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="CSV file to write.")
+    args = parser.parse_args()
+
+    # "AU.02" -> "New South Wales"
+    admin1_names = {row[0]: row[2] for row in read_tsv(args.admin1)}
+    country_names = {row[0]: row[4] for row in read_tsv(args.countries)}
+    keep_countries = set(args.countries_only.upper().split(",")) if args.countries_only else None
+
+    rows = []
+    for row in read_tsv(args.cities):
+        # geonameid, name, asciiname, alternatenames, latitude, longitude, feature class,
+        # feature code, country code, cc2, admin1 code, ..., population (index 14)
+        if keep_countries is None or row[8] in keep_countries:
+            rows.append(row)
+    # Smaller places named like a kept one are kept too, so the app can tell when a name is ambiguous
+    kept_names = {normalize_place_name(row[2] or row[1]) for row in rows if int(row[14] or 0) >= args.min_population}
+
+    places = []
+    for row in rows:
+        country_code, admin1_code, population = row[8], row[10], int(row[14] or 0)
+        if population < args.min_population and normalize_place_name(row[2] or row[1]) not in kept_names:
+            continue
+        admin1 = admin1_names.get(f"{country_code}.{admin1_code}", "")
+        places.append({
+            'name': row[2] or row[1],
+            'admin1': admin1,
+            'admin1_code': region_code(country_code, admin1, admin1_code),
+            'country': country_names.get(country_code, country_code),
+            'country_code': country_code,
+            'lat': round(float(row[4]), 4),
+            'lng': round(float(row[5]), 4),
+            'population': population,
+        })
+
+    # Sorted by name so the file diffs cleanly between rebuilds
+    places.sort(key=lambda place: (place['name'].lower(), -place['population']))
+    with open(args.output, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(places)
+    print(f"Wrote {len(places)} places to {args.output}.")
+
+if __name__ == "__main__":
+    main()
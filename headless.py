@@ -0,0 +1,72 @@
+# headless.py
+
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+from Business_Analyzer import DEFAULT_WEIGHTS, ExclusionIndex, JobStore, RESULTS_MODES, parse_exclusion_file, qualified_rows, run_analysis_job
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run a Business Analyzer job without the Streamlit UI. "
+                    "Re-running the same command resumes the job from its checkpoint."
+    )
+    parser.add_argument("--location", required=True, help="Location to search in (e.g., 'Sydney, Australia').")
+    parser.add_argument("--industry", required=True, help="Industry type (e.g., 'painter').")
+    parser.add_argument("--num-results", type=int, default=10, help="Number of businesses to fetch, or qualified businesses to find (max 50).")
+    parser.add_argument("--mode", choices=sorted(RESULTS_MODES.values()), default='fetch', help="'fetch' grades N businesses, 'qualified' stops once N businesses meet the threshold.")
+    parser.add_argument("--grade-threshold", type=float, default=50.0, help="Minimum grade score to include in the results.")
+    parser.add_argument("--output", default="businesses.csv", help="CSV file to write the qualified businesses to.")
+    parser.add_argument("--exclude", help="CSV or text file of Place IDs, websites and phone numbers to add to the saved exclusion list.")
+    parser.add_argument("--fresh", action="store_true", help="Discard any saved progress for this job and start again.")
+    args = parser.parse_args()
+
+    api_key = os.environ.get("GOOGLE_PLACES_API_KEY")
+    if not api_key:
+        sys.exit("Please set the GOOGLE_PLACES_API_KEY environment variable.")
+
+    # Same parameters as the Streamlit form with its default weights, so jobs are shared with the UI
+    params = {
+        'location': args.location,
+        'industry': args.industry,
+        'num_results': min(args.num_results, 50),
+        'results_mode': args.mode,
+        'grade_threshold': args.grade_threshold,
+        'weights': dict(DEFAULT_WEIGHTS),
+    }
+    # Same exclusion list as the app
+    exclusions = ExclusionIndex()
+    if args.exclude:
+        with open(args.exclude, "rb") as f:
+            exclusions.add(**parse_exclusion_file(f.read()))
+
+    store = JobStore()
+    if args.fresh:
+        store.delete(store.job_id_for(params))
+    job_id = store.create(params)
+    print(f"Running job {job_id}...")
+
+    meta = store.load(job_id)
+    if meta['status'] != 'completed':
+        meta = run_analysis_job(store, job_id, api_key, exclusions)
+    else:
+        print(f"Reusing the results analyzed at {meta['updated_at']} (use --fresh to fetch the latest data).")
+    if meta['status'] == 'failed':
+        sys.exit(meta['error'])
+
+    rows = qualified_rows(store.load_results(job_id), args.grade_threshold, exclusions)
+    if not rows:
+        print("No businesses met the grade threshold.")
+        return
+    df = pd.DataFrame(rows)
+    # Sort by Grade Score (descending) and Distance (ascending)
+    df.sort_values(by=['Grade Score', 'Distance (km)'], ascending=[False, True], inplace=True)
+    if args.mode == 'qualified':
+        df = df.head(params['num_results'])
+    df.to_csv(args.output, index=False)
+    print(f"Found {len(df)} business(es) that meet or exceed the grade threshold. Saved to {args.output}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,448 @@
+# load_test.py
+
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pyarrow as pa
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.NumberInput_pb2 import NumberInput
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Business_Analyzer.py")
+PAGE_SIZE = 20
+MAX_PAGES = 3
+STARTUP_TIMEOUT = 60  # Seconds to wait for the app server to come up
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Serve canned Geocoding, Nearby Search and Place Details responses, plus the
+    business websites checked by verify_website.
+    """
+
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass  # Keep the report readable
+
+    def _send(self, status, body=b"", content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _send_json(self, data):
+        self._send(200, json.dumps(data).encode("utf-8"))
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if url.path == "/maps/api/geocode/json":
+            self._send_json({'status': 'OK', 'results': [{'geometry': {'location': {'lat': -33.8688, 'lng': 151.2093}}}]})
+        elif url.path == "/maps/api/place/nearbysearch/json":
+            # Page tokens encode the keyword and page number
+            keyword, page = query['pagetoken'].rsplit(':', 1) if 'pagetoken' in query else (query['keyword'], '0')
+            page = int(page)
+            results = [
+                {'name': f"{keyword} business {page * PAGE_SIZE + i}", 'vicinity': f"{page * PAGE_SIZE + i} {keyword} street", 'place_id': f"{keyword}:{page * PAGE_SIZE + i}"}
+                for i in range(PAGE_SIZE)
+            ]
+            data = {'status': 'OK', 'results': results}
+            if page + 1 < MAX_PAGES:
+                data['next_page_token'] = f"{keyword}:{page + 1}"
+            self._send_json(data)
+        elif url.path == "/maps/api/place/details/json":
+            place_id = query['place_id']
+            rng = random.Random(hashlib.sha1(place_id.encode("utf-8")).hexdigest())
+            result = {
+                'formatted_phone_number': f"02 {rng.randint(1000, 9999)} {rng.randint(1000, 9999)}",
+                'rating': round(rng.uniform(1, 5), 1),
+                'user_ratings_total': rng.randint(0, 300),
+                'price_level': rng.randint(0, 4),
+                'types': ['painter', 'point_of_interest'],
+                'geometry': {'location': {'lat': -33.8688 + rng.uniform(-0.3, 0.3), 'lng': 151.2093 + rng.uniform(-0.3, 0.3)}},
+                'reviews': [],
+            }
+            if rng.random() < 0.6:
+                result['website'] = f"http://{self.headers['Host']}/site/{place_id}"
+            self._send_json({'status': 'OK', 'result': result})
+        elif url.path.startswith("/site/"):
+            self._send(200, b"<html></html>", content_type="text/html")
+        else:
+            self._send(404)
+
+def serve_stand_in(latency, conn):
+    """
+    Run the stand-in Google endpoints on a free local port until the process is terminated.
+
+    Parameters:
+        latency (float): Seconds to wait before answering each request.
+        conn (multiprocessing.connection.Connection): Receives the port once the server is listening.
+    """
+    StandInHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    conn.send(server.server_port)
+    conn.close()
+    server.serve_forever()
+
+def start_stand_in(latency):
+    """
+    Start the stand-in Google endpoints in their own process, so serving them does not
+    compete with the app or the simulated sessions for a GIL.
+
+    Parameters:
+        latency (float): Seconds to wait before answering each request.
+
+    Returns:
+        tuple: (multiprocessing.Process, port)
+    """
+    parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=serve_stand_in, args=(latency, child_conn), daemon=True)
+    process.start()
+    return process, parent_conn.recv()
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_app(stand_in_port, data_dir):
+    """
+    Launch the app with `streamlit run` and wait until it accepts connections.
+
+    Parameters:
+        stand_in_port (int): Port of the stand-in Google endpoints.
+        data_dir (str): Job store and cache directory for this run.
+
+    Returns:
+        tuple: (subprocess.Popen, port)
+
+    Raises:
+        RuntimeError: If the server exits or does not come up in time.
+    """
+    port = free_port()
+    env = dict(
+        os.environ,
+        GOOGLE_MAPS_API_BASE_URL=f"http://127.0.0.1:{stand_in_port}",
+        BUSINESS_ANALYZER_DATA_DIR=data_dir
+    )
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", APP_PATH,
+            "--server.headless", "true",
+            "--server.address", "127.0.0.1",
+            "--server.port", str(port),
+            "--server.fileWatcherType", "none",
+            "--browser.gatherUsageStats", "false",
+            # Worker threads have no script context, so Streamlit would warn on every UI call they make
+            "--logger.level", "error",
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL
+    )
+    deadline = time.perf_counter() + STARTUP_TIMEOUT
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"streamlit run exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return process, port
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("streamlit run did not start in time")
+
+def rss_kb(pid):
+    """
+    Return the resident set size of a process in kilobytes, or None where /proc is unavailable.
+    """
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        return None
+
+class SessionClient:
+    """
+    A browser stand-in: one websocket session against the app server that renders
+    nothing but keeps track of widget IDs, results and fragment auto-reruns.
+    """
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.widgets = {}  # Label -> element proto of each widget
+        self.widget_states = {}  # Widget ID -> value proto, as the frontend would hold it
+        self.page_script_hash = ""
+        self.auto_reruns = {}  # Fragment ID -> polling task
+        self.script_finished = False
+        self.first_row_at = None
+        self.completed_at = None
+        self.error = None
+
+    async def send_rerun(self, triggers=(), fragment_id=None):
+        msg = BackMsg()
+        msg.rerun_script.page_script_hash = self.page_script_hash
+        msg.rerun_script.widget_states.widgets.extend(self.widget_states.values())
+        for widget_id in triggers:
+            trigger = msg.rerun_script.widget_states.widgets.add()
+            trigger.id = widget_id
+            trigger.trigger_value = True
+        if fragment_id is not None:
+            msg.rerun_script.fragment_id = fragment_id
+            msg.rerun_script.is_auto_rerun = True
+        await self.websocket.send(msg.SerializeToString())
+
+    def set_value(self, label, value):
+        """
+        Change a widget's value the next time the form is submitted.
+        """
+        element = self.widgets[label]
+        widget = getattr(element, element.WhichOneof('type'))
+        state = self.widget_states.setdefault(widget.id, WidgetState(id=widget.id))
+        if element.WhichOneof('type') == 'number_input' and widget.data_type == NumberInput.INT:
+            state.int_value = int(value)
+        elif element.WhichOneof('type') == 'number_input':
+            state.double_value = float(value)
+        else:
+            state.string_value = value
+
+    async def _auto_rerun(self, interval, fragment_id):
+        while True:
+            await asyncio.sleep(interval)
+            await self.send_rerun(fragment_id=fragment_id)
+
+    def _stop_auto_reruns(self, fragment_ids=None):
+        for fragment_id in list(fragment_ids if fragment_ids is not None else self.auto_reruns):
+            task = self.auto_reruns.pop(fragment_id, None)
+            if task is not None:
+                task.cancel()
+
+    def _handle_element(self, element):
+        kind = element.WhichOneof('type')
+        widget = getattr(element, kind)
+        if getattr(widget, 'id', "") and getattr(widget, 'label', ""):
+            self.widgets[widget.label] = element
+        if kind == 'text' and widget.body.startswith("Processing complete!"):
+            self.completed_at = self.completed_at or time.perf_counter()
+        elif kind == 'dataframe' and self.first_row_at is None and widget.arrow_data.data:
+            if pa.ipc.open_stream(io.BytesIO(widget.arrow_data.data)).read_all().num_rows > 0:
+                self.first_row_at = time.perf_counter()
+        elif kind == 'alert' and widget.format == widget.ERROR:
+            self.error = widget.body
+        elif kind == 'exception':
+            self.error = f"{widget.type}: {widget.message}"
+
+    async def receive_until(self, done, timeout):
+        """
+        Handle server messages until done() is true.
+
+        Returns:
+            bool: False if the timeout passed first.
+        """
+        deadline = time.perf_counter() + timeout
+        while not done():
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return False
+            try:
+                data = await asyncio.wait_for(self.websocket.recv(), remaining)
+            except asyncio.TimeoutError:
+                return False
+            msg = ForwardMsg()
+            msg.ParseFromString(data)
+            kind = msg.WhichOneof('type')
+            if kind == 'new_session':
+                self.page_script_hash = msg.new_session.page_script_hash
+                # The browser drops its auto-rerun timers whenever the whole page reruns
+                if not msg.new_session.fragment_ids_this_run:
+                    self._stop_auto_reruns()
+            elif kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                self._handle_element(msg.delta.new_element)
+            elif kind == 'auto_rerun' and msg.auto_rerun.fragment_id not in self.auto_reruns:
+                self.auto_reruns[msg.auto_rerun.fragment_id] = asyncio.create_task(
+                    self._auto_rerun(msg.auto_rerun.interval, msg.auto_rerun.fragment_id)
+                )
+            elif kind == 'stop_auto_rerun':
+                self._stop_auto_reruns(msg.stop_auto_rerun.fragment_ids)
+            elif kind == 'script_finished':
+                self.script_finished = True
+        return True
+
+    async def run_script(self, timeout, triggers=()):
+        self.script_finished = False
+        await self.send_rerun(triggers)
+        return await self.receive_until(lambda: self.script_finished, timeout)
+
+    def close(self):
+        self._stop_auto_reruns()
+
+async def run_session(port, session_name, args):
+    """
+    Drive one simulated user through the form-submit path and follow the results panel
+    until the job finishes.
+
+    Parameters:
+        port (int): Port of the app server.
+        session_name (str): Industry keyword for this session; distinct names give distinct jobs.
+        args (argparse.Namespace): Load-test options.
+
+    Returns:
+        dict: Time to first row and to completion in seconds, or an error.
+    """
+    try:
+        async with websockets.connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"], max_size=None) as websocket:
+            client = SessionClient(websocket)
+            try:
+                if not await client.run_script(args.timeout):
+                    return {'error': "timed out loading the page"}
+                client.set_value("🔑 Google Places API Key", "load-test-key")
+                client.set_value("🏢 Industry Type", session_name)
+                client.set_value("📊 Number of Results", args.num_results)
+                client.set_value("📈 Grade Threshold", 0.0)  # Every analyzed business becomes a row
+                submit = client.widgets["Analyze Businesses"].button.id
+
+                start = time.perf_counter()
+                await client.send_rerun(triggers=[submit])
+                finished = await client.receive_until(lambda: client.completed_at or client.error, args.timeout)
+            finally:
+                client.close()
+    except (OSError, websockets.WebSocketException) as e:
+        return {'error': f"connection failed: {e}"}
+
+    if client.error:
+        return {'error': client.error}
+    if not finished:
+        return {'error': "timed out"}
+    completion = client.completed_at - start
+    first_row = client.first_row_at - start if client.first_row_at is not None else completion
+    return {'first_row': min(first_row, completion), 'completion': completion}
+
+async def warm_up(port, timeout):
+    """
+    Load the page once, so the first step's timings and memory do not include the
+    app's imports and cached resources being set up.
+    """
+    async with websockets.connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"], max_size=None) as websocket:
+        client = SessionClient(websocket)
+        await client.run_script(timeout)
+        client.close()
+
+def percentile(values, pct):
+    """
+    Return the pct-th percentile of values (nearest-rank), or None if there are none.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))]
+
+async def run_step(app, port, sessions, step, args):
+    """
+    Run sessions concurrent simulated users and summarize their timings.
+    """
+    # Distinct keywords per session, unless measuring how well overlapping queries coalesce
+    names = [f"loadtest{step}" if args.overlap else f"loadtest{step}s{i}" for i in range(sessions)]
+
+    rss_before = rss_kb(app.pid)
+    peak_rss = rss_before
+
+    async def sample_rss():
+        nonlocal peak_rss
+        while True:
+            await asyncio.sleep(0.05)
+            peak_rss = max(peak_rss, rss_kb(app.pid) or 0)
+
+    sampler = asyncio.create_task(sample_rss()) if rss_before is not None else None
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(run_session(port, name, args) for name in names))
+    wall = time.perf_counter() - start
+    if sampler is not None:
+        sampler.cancel()
+
+    ok = [o for o in outcomes if 'error' not in o]
+    first_rows = [o['first_row'] for o in ok]
+    completions = [o['completion'] for o in ok]
+    return {
+        'sessions': sessions,
+        'errors': len(outcomes) - len(ok),
+        'first_row_p50': percentile(first_rows, 50),
+        'first_row_p95': percentile(first_rows, 95),
+        'first_row_p99': percentile(first_rows, 99),
+        'completion_p50': percentile(completions, 50),
+        'completion_p95': percentile(completions, 95),
+        'completion_p99': percentile(completions, 99),
+        'memory_per_session_mb': (peak_rss - rss_before) / 1024 / sessions if rss_before is not None else None,
+        'sessions_per_minute': len(ok) / wall * 60,
+        'wall_seconds': wall,
+        'sample_errors': sorted({o['error'] for o in outcomes if 'error' in o})[:3],
+    }
+
+def format_seconds(value):
+    return "-" if value is None else f"{value:.2f}"
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the Business Analyzer with `streamlit run` against local stand-ins for the Google "
+                    "endpoints, drive concurrent browser sessions through the form and report latency, "
+                    "memory and throughput."
+    )
+    parser.add_argument("--sessions", default="1,5,10,25", help="Comma-separated concurrent session counts to test.")
+    parser.add_argument("--num-results", type=int, default=5, help="Businesses each session asks for.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds the stand-in waits before each response.")
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds before a session is counted as failed.")
+    parser.add_argument("--overlap", action="store_true", help="Have every session in a step run the same query.")
+    parser.add_argument("--json", help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    stand_in, stand_in_port = start_stand_in(args.latency)
+    app, port = start_app(stand_in_port, tempfile.mkdtemp(prefix="business-analyzer-load-test-"))
+    try:
+        asyncio.run(warm_up(port, args.timeout))
+        print(f"{'Sessions':>8} {'Errors':>6} {'TTFR p50':>9} {'p95':>7} {'p99':>7} {'Done p50':>9} {'p95':>7} {'p99':>7} {'MB/session':>10} {'Sessions/min':>12}")
+        steps = []
+        for step, sessions in enumerate(int(n) for n in args.sessions.split(",")):
+            result = asyncio.run(run_step(app, port, sessions, step, args))
+            steps.append(result)
+            memory = "-" if result['memory_per_session_mb'] is None else f"{result['memory_per_session_mb']:.1f}"
+            print(
+                f"{result['sessions']:>8} {result['errors']:>6} "
+                f"{format_seconds(result['first_row_p50']):>9} {format_seconds(result['first_row_p95']):>7} {format_seconds(result['first_row_p99']):>7} "
+                f"{format_seconds(result['completion_p50']):>9} {format_seconds(result['completion_p95']):>7} {format_seconds(result['completion_p99']):>7} "
+                f"{memory:>10} {result['sessions_per_minute']:>12.1f}"
+            )
+            for error in result['sample_errors']:
+                print(f"         error: {error}", file=sys.stderr)
+
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(steps, f, indent=2)
+    finally:
+        app.terminate()
+        app.wait()
+        stand_in.terminate()
+
+if __name__ == "__main__":
+    main()
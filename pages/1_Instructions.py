@@ -44,10 +44,13 @@ def main():
 
     2. **Specify Location and Industry:**
        - **📍 Location:** Enter the location you want to search in (e.g., "San Diego, California").
+       - **🗺️ Known Location (optional):** Start typing to pick a known city instead. When you submit, it replaces the location above, so the form always shows the place that was searched. Known cities are located without calling the Geocoding API.
        - **🏢 Industry Type:** Enter the industry you're interested in (e.g., "painter").
 
     3. **Set Number of Results:**
-       - **📊 Number of Results:** Specify how many businesses you want to fetch (up to 50).
+       - **🎯 Results Mode:** Choose **Fetch N businesses** to grade a fixed number of businesses, or **Find N qualified businesses** to keep fetching until N businesses meet your grade threshold.
+       - **📊 Number of Results:** Specify how many businesses you want to fetch, or how many qualified businesses to find (up to 50).
+       - **Note:** Google returns at most 60 businesses per search, so a qualified search may finish with fewer than N results.
 
     4. **Set Grade Threshold:**
        - **📈 Grade Threshold:** Define the minimum grade score required for a business to be included in the final results.
@@ -62,14 +65,26 @@ def main():
        - Select or deselect the columns you wish to include in your CSV download by checking or unchecking the corresponding boxes.
        - **Note:** By default, all columns are selected. If you do not customize the CSV columns, the default set will be used.
 
-    7. **Analyze Businesses:**
+    7. **Exclude Businesses (Optional):**
+       - Click on the **🚫 Exclusion List** expander.
+       - Upload a CSV with **Place ID**, **Website** and/or **Phone** columns (a previous download from this app works), or a plain list of Place IDs, websites and phone numbers.
+       - Businesses listed by Place ID are skipped before their details are fetched, so they never cost a Place Details call. Websites and phone numbers only appear in a business's details, so those businesses are left out of the results after their details have been fetched. The list is saved and applies to every later analysis.
+
+    8. **Analyze Businesses:**
        - Click on the **Analyze Businesses** button.
        - The app will fetch, analyze, and display qualified businesses based on your inputs.
+       - The analysis runs in the background and results appear as they are found. If you refresh the page or lose your connection, submit the form again with the same settings to pick up where it left off.
+       - Submitting settings that have already been analyzed shows the saved results. Click **🔄 Start Fresh** to run the analysis again.
 
-    8. **Download Results:**
+    9. **Download Results:**
        - If businesses meet the grading criteria, you can download the results as a CSV file by clicking the **📥 Download as CSV** button.
        - The downloaded CSV will include only the columns you selected in the **📋 Customize CSV Columns** section.
 
+    10. **Compare Weight Scenarios (Optional):**
+       - Once an analysis completes, open the **🧪 Weight Scenarios** expander.
+       - Pick the weight presets to compare, optionally adding a generated grid of weightings.
+       - The table shows each business's rank under every preset, how stable its rank is, and a **Shortlisted** flag for businesses that rank highly across scenarios and are not outperformed on every criterion by another business.
+
     ### Tips for Effective Use
 
     - **API Usage:** Be mindful of your API usage to avoid unexpected charges. Monitor your usage in the [Google Cloud Console](https://console.cloud.google.com/).
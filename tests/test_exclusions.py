@@ -0,0 +1,51 @@
+import pytest
+
+from Business_Analyzer import ExclusionIndex, normalize_phone, normalize_website, parse_exclusion_file
+
+@pytest.mark.parametrize("phone", ["(02) 9999 1234", "+61 2 9999 1234", "+61 (0)2 9999 1234", "0061 2 9999 1234", "02-9999-1234"])
+def test_national_and_international_formats_match(phone):
+    assert normalize_phone(phone) == "299991234"
+
+def test_numbers_sharing_their_last_digits_do_not_match():
+    assert normalize_phone("(212) 555-1234") != normalize_phone("(312) 555-1234")
+    assert normalize_phone("+1 212 555 1234") == normalize_phone("(212) 555-1234")
+
+@pytest.mark.parametrize("phone", [None, "", "N/A", "12345", "+61 123"])
+def test_short_or_missing_phone_numbers_are_ignored(phone):
+    assert normalize_phone(phone) is None
+
+@pytest.mark.parametrize("url", ["https://www.Example.com/", "http://example.com", "example.com/?utm_source=maps", "www.example.com#contact"])
+def test_website_formats_match(url):
+    assert normalize_website(url) == "example.com"
+
+def test_website_paths_are_kept():
+    assert normalize_website("https://example.com/sydney/") == "example.com/sydney"
+    assert normalize_website("N/A") is None
+
+def test_csv_download_is_read_by_column():
+    content = "Name,Phone,Website,Place ID\nAcme,(02) 9999 1234,https://acme.com.au/,ChIJacme\nBeta,N/A,,ChIJbeta\n".encode("utf-8-sig")
+    entries = parse_exclusion_file(content)
+    assert entries == {
+        'place_ids': ["ChIJacme", "ChIJbeta"],
+        'websites': ["https://acme.com.au/"],
+        'phones': ["(02) 9999 1234", "N/A"],
+    }
+
+def test_plain_list_is_classified_by_value():
+    entries = parse_exclusion_file(b"ChIJacme\nwww.beta.com\n+61 2 9999 1234\n212.555.1234\n")
+    assert entries == {'place_ids': ["ChIJacme"], 'websites': ["www.beta.com"], 'phones': ["+61 2 9999 1234", "212.555.1234"]}
+
+def test_index_matches_rows_and_persists(tmp_path):
+    path = str(tmp_path / "exclusions.json")
+    index = ExclusionIndex(path)
+    index.add(place_ids=["ChIJacme"], websites=["https://www.beta.com/"], phones=["+61 2 9999 1234", "N/A"])
+
+    reloaded = ExclusionIndex(path)
+    assert len(reloaded) == 3
+    assert reloaded.excludes_row({'Place ID': "ChIJacme", 'Website': "N/A", 'Phone': "N/A"})
+    assert reloaded.excludes_row({'Place ID': "other", 'Website': "http://beta.com", 'Phone': "N/A"})
+    assert reloaded.excludes_row({'Place ID': "other", 'Website': "N/A", 'Phone': "(02) 9999 1234"})
+    assert not reloaded.excludes_row({'Place ID': "other", 'Website': "N/A", 'Phone': "(03) 9999 1234"})
+
+    reloaded.clear()
+    assert len(ExclusionIndex(path)) == 0
@@ -0,0 +1,63 @@
+import pytest
+
+from Business_Analyzer import Gazetteer, normalize_place_name
+
+@pytest.fixture(scope='module')
+def gazetteer():
+    return Gazetteer.load()
+
+def place(name, admin1, admin1_code, country, country_code, population, lat=0.0, lng=0.0):
+    return {
+        'name': name, 'admin1': admin1, 'admin1_code': admin1_code, 'country': country,
+        'country_code': country_code, 'lat': lat, 'lng': lng, 'population': population,
+    }
+
+def test_name_resolves_only_if_much_more_populous_than_its_namesakes():
+    gazetteer = Gazetteer([
+        place("Springfield", "Illinois", "IL", "United States", "US", 114000, lat=1.0),
+        place("Springfield", "Missouri", "MO", "United States", "US", 169000, lat=2.0),
+        place("Perth", "Western Australia", "WA", "Australia", "AU", 2000000, lat=3.0),
+        place("Perth", "Scotland", "SCT", "United Kingdom", "GB", 47000, lat=4.0),
+    ])
+    assert gazetteer.resolve("Springfield") is None
+    assert gazetteer.resolve("Springfield, MO") == (2.0, 0.0)
+    assert gazetteer.resolve("Perth") == (3.0, 0.0)
+    assert gazetteer.resolve("Perth, Scotland") == (4.0, 0.0)
+    assert gazetteer.resolve("Atlantis") is None
+
+def test_ambiguous_names_are_left_to_the_geocoding_api(gazetteer):
+    assert gazetteer.resolve("Richmond") is None
+    assert gazetteer.resolve("Birmingham") is None
+    assert gazetteer.resolve("Richmond, Virginia") is not None
+    assert gazetteer.resolve("Birmingham, United Kingdom") is not None
+
+def test_region_names_are_not_resolved_to_a_city(gazetteer):
+    # The Australian state, not the Canadian city
+    assert gazetteer.resolve("Victoria") is None
+    assert gazetteer.resolve("Victoria, British Columbia") is not None
+
+def test_qualifiers_pick_the_named_place(gazetteer):
+    paris_france = gazetteer.resolve("Paris")
+    paris_texas = gazetteer.resolve("Paris, Texas")
+    assert paris_france == gazetteer.resolve("Paris, France")
+    assert paris_texas == gazetteer.resolve("paris tx") == gazetteer.resolve("Paris, TX, United States")
+    assert paris_texas != paris_france
+    assert gazetteer.resolve("Sydney, NSW") == gazetteer.resolve("Sydney, Australia") == gazetteer.resolve("sydney")
+
+def test_every_display_name_resolves_to_its_place(gazetteer):
+    for p in gazetteer.places:
+        name = gazetteer.display_name(p)
+        key = normalize_place_name(name)
+        matches = [gazetteer.places[idx] for idx in gazetteer._exact(key)]
+        if len(matches) == 1 and key not in gazetteer._regions:
+            assert gazetteer.resolve(name) == (p['lat'], p['lng']), name
+        else:
+            # A name that also fits other places (e.g. "Yamagata, Japan") or a region (e.g.
+            # "Singapore") resolves to the most populous match only if it is not ambiguous
+            largest = max(matches, key=lambda match: match['population'])
+            assert gazetteer.resolve(name) in (None, (largest['lat'], largest['lng'])), name
+
+def test_display_names_are_unique_and_most_populous_first(gazetteer):
+    names = gazetteer.display_names()
+    assert len(names) == len(set(names))
+    assert names[0] == gazetteer.display_name(max(gazetteer.places, key=lambda p: p['population']))
@@ -0,0 +1,48 @@
+import json
+import os
+
+import pytest
+
+import Business_Analyzer
+from Business_Analyzer import HttpArchive, ReplayedResponse
+
+URL = "https://maps.googleapis.com/maps/api/place/details/json"
+
+@pytest.fixture
+def archive_path(tmp_path, monkeypatch):
+    def fake_request(method, url, params=None, **kwargs):
+        return ReplayedResponse(url, 200, json.dumps({'place_id': params['place_id']}))
+    monkeypatch.setattr(Business_Analyzer.requests, 'request', fake_request)
+    return str(tmp_path / 'archive.jsonl.gz')
+
+def record(path, place_ids):
+    archive = HttpArchive(path, 'record')
+    for place_id in place_ids:
+        archive.request('GET', URL, params={'place_id': place_id, 'key': 'secret'})
+
+def test_replays_recorded_responses_without_the_api_key(archive_path):
+    record(archive_path, ['p0', 'p1'])
+    archive = HttpArchive(archive_path, 'replay')
+    assert archive.request('GET', URL, params={'place_id': 'p1', 'key': 'other'}).json() == {'place_id': 'p1'}
+    with open(archive_path, 'rb') as f:
+        assert b'secret' not in f.read()
+
+def test_truncated_archive_keeps_complete_records(archive_path):
+    record(archive_path, ['p0', 'p1'])
+    with open(archive_path, 'r+b') as f:
+        f.truncate(os.path.getsize(archive_path) - 10)
+
+    archive = HttpArchive(archive_path, 'replay')
+    assert archive.request('GET', URL, params={'place_id': 'p0'}).json() == {'place_id': 'p0'}
+    with pytest.raises(Business_Analyzer.requests.ConnectionError):
+        archive.request('GET', URL, params={'place_id': 'p1'})
+
+def test_recording_after_truncation_stays_readable(archive_path):
+    record(archive_path, ['p0', 'p1'])
+    with open(archive_path, 'r+b') as f:
+        f.truncate(os.path.getsize(archive_path) - 10)
+    record(archive_path, ['p2'])
+
+    archive = HttpArchive(archive_path, 'replay')
+    for place_id in ['p0', 'p2']:
+        assert archive.request('GET', URL, params={'place_id': place_id}).json() == {'place_id': place_id}
@@ -0,0 +1,168 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import Business_Analyzer
+from Business_Analyzer import JobStore, ReplayedResponse, run_analysis_job
+
+PARAMS = {
+    'location': "Sydney, Australia",  # Resolved by the bundled gazetteer
+    'industry': 'painter',
+    'num_results': 5,
+    'results_mode': 'fetch',
+    'grade_threshold': 0.0,
+    'weights': None,
+}
+
+class FakePlacesApi:
+    """
+    Serve Nearby Search and Place Details responses for five businesses per page and record every request.
+    """
+
+    def __init__(self, search_status='OK', fail_details_for=(), pages=1):
+        self.search_status = search_status
+        self.fail_details_for = set(fail_details_for)
+        self.pages = pages
+        self.requests = []
+
+    def __call__(self, url, params=None, **kwargs):
+        self.requests.append((url, dict(params or {})))
+        if url.endswith('/nearbysearch/json'):
+            page = int(params.get('pagetoken', 0))
+            results = [{'name': f"Painter {i}", 'vicinity': f"{i} Main Street", 'place_id': f"p{i}"} for i in range(5 * page, 5 * page + 5)]
+            data = {'status': self.search_status, 'results': results if self.search_status == 'OK' else []}
+            if self.search_status == 'OK' and page + 1 < self.pages:
+                data['next_page_token'] = str(page + 1)
+        else:
+            place_id = params['place_id']
+            if place_id in self.fail_details_for:
+                raise Business_Analyzer.requests.ConnectionError("connection reset")
+            data = {'status': 'OK', 'result': {'rating': 4.5, 'geometry': {'location': {'lat': -33.87, 'lng': 151.21}}}}
+        return ReplayedResponse(url, 200, json.dumps(data))
+
+    def details_requested(self):
+        return [params['place_id'] for url, params in self.requests if url.endswith('/details/json')]
+
+    def searches_requested(self):
+        return [params for url, params in self.requests if url.endswith('/nearbysearch/json')]
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(Business_Analyzer.time, 'sleep', lambda seconds: None)
+    Business_Analyzer.get_shared_cache().clear()
+    return JobStore(str(tmp_path / 'jobs'))
+
+def test_job_id_depends_only_on_params(store):
+    assert store.create(PARAMS) == store.create(dict(PARAMS))
+    assert store.create(PARAMS) != store.create({**PARAMS, 'industry': 'plumber'})
+
+def test_interrupted_job_resumes_from_checkpoint(store, monkeypatch):
+    api = FakePlacesApi(fail_details_for={'p3'})
+    monkeypatch.setattr(Business_Analyzer, 'http_get', api)
+    job_id = store.create(PARAMS)
+
+    meta = run_analysis_job(store, job_id, 'key')
+    assert meta['status'] == 'failed'
+    assert 'p3' in meta['error']
+    assert [r['place_id'] for r in store.load_results(job_id)] == ['p0', 'p1', 'p2']
+
+    # Resuming neither searches again nor re-fetches the checkpointed businesses
+    api.fail_details_for.clear()
+    api.requests.clear()
+    assert store.create(PARAMS) == job_id
+    meta = run_analysis_job(store, job_id, 'key')
+    assert meta['status'] == 'completed'
+    assert api.details_requested() == ['p3', 'p4']
+    assert not any(url.endswith('/nearbysearch/json') for url, _ in api.requests)
+    assert [r['place_id'] for r in store.load_results(job_id)] == ['p0', 'p1', 'p2', 'p3', 'p4']
+
+def test_qualified_job_stops_once_enough_businesses_qualify(store, monkeypatch):
+    api = FakePlacesApi(pages=2)
+    monkeypatch.setattr(Business_Analyzer, 'http_get', api)
+    params = {**PARAMS, 'results_mode': 'qualified', 'num_results': 3}
+    job_id = store.create(params)
+
+    # Every business qualifies, so details stop at the third and the next page is never requested
+    assert run_analysis_job(store, job_id, 'key')['status'] == 'completed'
+    assert api.details_requested() == ['p0', 'p1', 'p2']
+    assert len(api.searches_requested()) == 1
+    assert [r['place_id'] for r in store.load_results(job_id)] == ['p0', 'p1', 'p2']
+
+    # Submitting again reuses the completed job, and rerunning it makes no request
+    api.requests.clear()
+    assert store.create(params) == job_id
+    assert store.load(job_id)['status'] == 'completed'
+    assert run_analysis_job(store, job_id, 'key')['status'] == 'completed'
+    assert api.requests == []
+
+    # Nor does resuming a run interrupted after N was reached but before it was marked completed
+    store.update(job_id, status='running')
+    assert run_analysis_job(store, job_id, 'key')['status'] == 'completed'
+    assert api.requests == []
+    assert len(store.load_results(job_id)) == 3
+
+def test_checkpoint_ignores_partially_written_line(store):
+    job_id = store.create(PARAMS)
+    store.append_result(job_id, {'place_id': 'p0', 'row': None, 'scores': None})
+    with open(store._results_path(job_id), 'a', encoding='utf-8') as f:
+        f.write('{"place_id": "p1", "ro')
+    assert [r['place_id'] for r in store.load_results(job_id)] == ['p0']
+
+def test_resume_after_partially_written_line_keeps_every_result(store, monkeypatch):
+    api = FakePlacesApi(fail_details_for={'p2'})
+    monkeypatch.setattr(Business_Analyzer, 'http_get', api)
+    job_id = store.create(PARAMS)
+    assert run_analysis_job(store, job_id, 'key')['status'] == 'failed'
+    with open(store._results_path(job_id), 'a', encoding='utf-8') as f:
+        f.write('{"place_id": "p2", "ro')
+
+    api.fail_details_for.clear()
+    assert run_analysis_job(store, job_id, 'key')['status'] == 'completed'
+    assert [r['place_id'] for r in store.load_results(job_id)] == ['p0', 'p1', 'p2', 'p3', 'p4']
+
+def test_expired_jobs_are_deleted(tmp_path, monkeypatch):
+    monkeypatch.setattr(Business_Analyzer.time, 'sleep', lambda seconds: None)
+    monkeypatch.setattr(Business_Analyzer, 'http_get', FakePlacesApi())
+    store = JobStore(str(tmp_path / 'jobs'), max_age=timedelta(days=7))
+    job_id = store.create(PARAMS)
+    assert run_analysis_job(store, job_id, 'key')['status'] == 'completed'
+    other_id = store.create({**PARAMS, 'industry': 'plumber'})
+
+    # A completed job is reused within max_age
+    assert store.create(PARAMS) == job_id
+    assert store.load(job_id)['status'] == 'completed'
+
+    # Once it is older, it is started afresh and other old jobs are removed from disk
+    stale = (datetime.now() - timedelta(days=8)).isoformat(timespec='seconds')
+    store.update(other_id, status='failed')
+    for stale_id in (job_id, other_id):
+        meta = store.load(stale_id)
+        meta['updated_at'] = stale
+        store._save(stale_id, meta)
+    assert store.create(PARAMS) == job_id
+    assert store.load(job_id)['status'] == 'queued'
+    assert store.load_results(job_id) == []
+    assert store.load(other_id) is None
+
+def test_denied_request_fails_the_job(store, monkeypatch):
+    monkeypatch.setattr(Business_Analyzer, 'http_get', FakePlacesApi(search_status='REQUEST_DENIED'))
+    job_id = store.create(PARAMS)
+
+    meta = run_analysis_job(store, job_id, 'bad-key')
+    assert meta['status'] == 'failed'
+    assert 'REQUEST_DENIED' in meta['error']
+    assert store.load_results(job_id) == []
+
+def test_empty_completed_job_is_not_reused(store, monkeypatch):
+    api = FakePlacesApi(search_status='ZERO_RESULTS')
+    monkeypatch.setattr(Business_Analyzer, 'http_get', api)
+    job_id = store.create(PARAMS)
+    assert run_analysis_job(store, job_id, 'key')['status'] == 'completed'
+
+    # Submitting again starts a new search instead of showing the empty result
+    api.search_status = 'OK'
+    assert store.create(PARAMS) == job_id
+    assert store.load(job_id)['status'] == 'queued'
+    assert run_analysis_job(store, job_id, 'key')['status'] == 'completed'
+    assert len(store.load_results(job_id)) == 5
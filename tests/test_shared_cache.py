@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from Business_Analyzer import SharedCache
+
+def test_caches_value_until_ttl_expires():
+    cache = SharedCache()
+    calls = []
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_compute('key', compute, ttl=0.05) == 1
+    assert cache.get_or_compute('key', compute, ttl=0.05) == 1
+    time.sleep(0.1)
+    assert cache.get_or_compute('key', compute, ttl=0.05) == 2
+
+def test_concurrent_lookups_share_one_call():
+    cache = SharedCache()
+    calls = []
+    release = threading.Event()
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return 'value'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('key', compute, ttl=60))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)  # Let every thread reach the cache before the leader finishes
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == ['value'] * 8
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    cache = SharedCache()
+    release = threading.Event()
+    def failing():
+        release.wait(5)
+        raise ValueError("boom")
+
+    errors = []
+    def lookup():
+        try:
+            cache.get_or_compute('key', failing, ttl=60)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=lookup) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(errors) == 4
+    assert cache.get_or_compute('key', lambda: 'recovered', ttl=60) == 'recovered'
+
+def test_rejected_values_are_not_cached():
+    cache = SharedCache()
+    values = iter([False, True])
+    assert cache.get_or_compute('key', lambda: next(values), ttl=60, should_cache=bool) is False
+    assert cache.get_or_compute('key', lambda: next(values), ttl=60, should_cache=bool) is True
+
+def test_evicts_least_recently_used_entry():
+    cache = SharedCache(max_entries=2)
+    cache.get_or_compute('a', lambda: 1, ttl=60)
+    cache.get_or_compute('b', lambda: 2, ttl=60)
+    cache.get_or_compute('a', lambda: pytest.fail("'a' should still be cached"), ttl=60)
+    cache.get_or_compute('c', lambda: 3, ttl=60)
+
+    assert cache.get_or_compute('a', lambda: 'recomputed', ttl=60) == 1
+    assert cache.get_or_compute('b', lambda: 'recomputed', ttl=60) == 'recomputed'
@@ -0,0 +1,24 @@
+import numpy as np
+
+from Business_Analyzer import DEFAULT_WEIGHTS, GRADING_CRITERIA, criteria_matrix, pareto_optimal, rank_rows, sweep_weight_scenarios, weighted_grade
+
+def test_rank_rows_gives_ties_the_best_rank():
+    values = np.array([[5.0, 7.5, 5.0, 0.0, 7.5], [0.0, 0.0, 1.0, 2.0, 3.0]], dtype=np.float32)
+    assert rank_rows(values).tolist() == [[3, 1, 3, 5, 1], [4, 4, 3, 2, 1]]
+
+def test_sweep_matches_weighted_grade():
+    rng = np.random.default_rng(0)
+    scores = [dict(zip(GRADING_CRITERIA, rng.uniform(0, 10, len(GRADING_CRITERIA)))) for _ in range(50)]
+    grades, ranks, summary = sweep_weight_scenarios(criteria_matrix(scores), {'Default': DEFAULT_WEIGHTS}, top_k=5)
+
+    expected = np.array([weighted_grade(s) for s in scores])
+    np.testing.assert_allclose(grades['Default'], expected, rtol=1e-5)
+    assert ranks['Default'].tolist() == (np.argsort(np.argsort(-expected)) + 1).tolist()
+    assert summary['Consensus Rank'].tolist() == list(range(1, 51))
+
+def test_pareto_optimal_matches_pairwise_check():
+    rng = np.random.default_rng(1)
+    # Small integer features give plenty of ties and identical businesses
+    features = rng.integers(0, 4, (700, 4)).astype(np.float32)
+    expected = [not any((other >= row).all() and (other > row).any() for other in features) for row in features]
+    assert pareto_optimal(features).tolist() == expected